@@ -0,0 +1,99 @@
+"""
+Prüfung: große Räume und lange Ereignis-Zeilen im Unix-Socket-Broker (WS_BROKER=unix).
+
+    python benchmarks/broker_lines.py [--participants 1500] [--line-limit 262144]
+
+Zwei Broker im selben Prozess: der erste wird Hub, der zweite verbindet sich erst, wenn schon
+alle Teilnehmer beigetreten sind, und muss den vollständigen Präsenz-Snapshot bekommen.
+Danach gehen Ereignisse knapp unter dem Zeilenlimit in beide Richtungen, und eine Zeile über
+dem Limit darf nur die Verbindung trennen: der Worker verbindet sich neu und empfängt weiter.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import common
+
+
+async def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+async def run(args) -> bool:
+    main = common.load_app(WS_BROKER_LINE_LIMIT=args.line_limit)
+    path = os.path.join(tempfile.mkdtemp(prefix="quickpoll-broker-"), "broker.sock")
+    received = {"hub": [], "worker": []}
+    replica = main.MemoryPresenceStore(main.PRESENCE_TTL_SECONDS)
+
+    def worker_handler(event: dict):
+        received["worker"].append(event["op"])
+        if event["op"] in ("join", "refresh", "leave", "clear", "presence_snapshot"):
+            replica.apply(event)
+
+    hub = main.UnixSocketBroker(path, lambda event: received["hub"].append(event["op"]))
+    hub.ensure_started()
+    await wait_for(lambda: hub.subscribed)
+    expires_at = time.time() + 60
+    for index in range(args.participants):
+        hub.publish({"op": "join", "survey_id": "1234", "session_id": f"sess-{index:032x}", "expires_at": expires_at})
+    await wait_for(lambda: received["hub"].count("join") == args.participants)
+
+    ok = True
+    worker = main.UnixSocketBroker(path, worker_handler)
+    worker.ensure_started()
+    await wait_for(lambda: worker.subscribed)
+    await asyncio.sleep(0.2)
+    count = await replica.count("1234")
+    snapshots = received["worker"].count("presence_snapshot")
+    print(f"Snapshot für neuen Worker: {count} von {args.participants} Teilnehmern in {snapshots} Zeilen")
+    ok &= count == args.participants
+
+    payload = "x" * (args.line_limit - 1024)
+    hub.publish({"op": "large", "payload": payload})
+    worker.publish({"op": "large", "payload": payload})
+    delivered = await wait_for(lambda: received["worker"].count("large") == 2 and received["hub"].count("large") == 2)
+    print(f"Zeilen knapp unter dem Limit ({len(payload) // 1024} KiB) in beide Richtungen: {'zugestellt' if delivered else 'FEHLT'}")
+    ok &= delivered
+
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull  # Logs von Trennung und Neuverbindung
+        try:
+            worker.publish({"op": "too_large", "payload": "x" * (args.line_limit * 2)})
+            await asyncio.sleep(0.5)
+            await wait_for(lambda: worker.subscribed)
+            hub.publish({"op": "after_reconnect"})
+            recovered = await wait_for(lambda: "after_reconnect" in received["worker"])
+        finally:
+            sys.stdout = stdout
+    print(f"Zeile über dem Limit: Worker-Task {'läuft' if not worker.task.done() else 'BEENDET'}, "
+          f"danach {'weiter empfangen' if recovered else 'NICHTS mehr empfangen'}")
+    ok &= recovered and not worker.task.done() and not hub.task.done()
+
+    worker.task.cancel()
+    hub.server.close()
+    for client in list(hub.hub_clients):
+        client.close()
+    await asyncio.sleep(0.1)
+    hub.task.cancel()
+    print("OK" if ok else "FEHLER")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=1500)
+    parser.add_argument("--line-limit", type=int, default=256 * 1024, help="WS_BROKER_LINE_LIMIT für den Test")
+    ok = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Gemeinsame Hilfen für die Benchmarks und Lasttests in diesem Ordner"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_app(**env):
+    """
+    main.py mit einer frischen Datenbank in einem temporären Verzeichnis importieren.
+    env überschreibt Umgebungsvariablen (z.B. SQLITE_JOURNAL_MODE) vor dem Import.
+    """
+    workdir = tempfile.mkdtemp(prefix="quickpoll-bench-")
+    os.chdir(workdir)
+    os.environ.update({name: str(value) for name, value in env.items()})
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+    return main
+
+
+def asgi_client(main):
+    """httpx Client, der die App direkt im Prozess aufruft (ohne Netzwerk)"""
+    import httpx
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app, raise_app_exceptions=False),
+        base_url="http://quickpoll",
+        timeout=120
+    )
+
+
+def start_server(port: int, workers: int = 1, backend_dir: str = BACKEND_DIR, **env) -> subprocess.Popen:
+    """
+    uvicorn mit frischer Datenbank starten und warten bis er antwortet.
+    backend_dir kann auf einen älteren Checkout zeigen, um vorher/nachher zu vergleichen.
+    """
+    import httpx
+    workdir = tempfile.mkdtemp(prefix="quickpoll-bench-")
+    server_env = dict(os.environ, PYTHONPATH=backend_dir, **{name: str(value) for name, value in env.items()})
+    if workers > 1:
+        # Tabellen einmal vorab anlegen, sonst legen alle Worker gleichzeitig an
+        subprocess.run([sys.executable, "-c", "import main"], cwd=workdir, env=server_env, check=True,
+                       stdout=subprocess.DEVNULL)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=workdir, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+    )
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health/")
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"Server auf Port {port} startet nicht")
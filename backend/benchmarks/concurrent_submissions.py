@@ -0,0 +1,76 @@
+"""
+Lasttest: viele parallele Submissions dürfen keinen Zähler verlieren.
+
+    python benchmarks/concurrent_submissions.py [--count 2000] [--concurrency 500] [--url http://127.0.0.1:8000]
+
+Ohne --url läuft die App im Prozess mit frischer Datenbank. Mit --url wird ein laufender
+Server getestet (auch mit mehreren Workern). Prüft, dass response_count, die gespeicherten
+Responses und die Analytics exakt der Anzahl erfolgreicher Submissions entsprechen.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import common
+
+
+async def run(client, count: int, concurrency: int) -> bool:
+    headers = {"X-Session-ID": "concurrency-check"}
+    survey = (await client.post("/surveys/", headers=headers, json={
+        "title": "Concurrency Check",
+        "questions": [{"title": "Frage", "type": "single_choice", "options": ["a", "b"], "required": True}]
+    })).json()
+    survey_id, question_id = survey["id"], survey["questions"][0]["id"]
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def submit(i: int) -> int:
+        async with limit:
+            response = await client.post("/responses/", json={
+                "survey_id": survey_id,
+                "answers": [{"question_id": question_id, "answer": "ab"[i % 2]}]
+            })
+            return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*[submit(i) for i in range(count)])
+    elapsed = time.perf_counter() - started
+    accepted = statuses.count(200)
+
+    response_count = (await client.get(f"/public/surveys/{survey_id}", params={"fields": "response_count"})).json()["response_count"]
+    stored = len((await client.get(f"/surveys/{survey_id}/responses/", headers=headers)).json())
+    analytics = (await client.get(f"/surveys/{survey_id}/analytics/", headers=headers)).json()
+    answer_counts = analytics["questions_analytics"][question_id]["answer_distribution"]
+
+    print(f"{count} Submissions in {elapsed:.2f} s ({count / elapsed:.0f}/s), {accepted} angenommen")
+    print(f"response_count={response_count} gespeichert={stored} answer_distribution={answer_counts}")
+
+    expected_counts = {"a": (accepted + 1) // 2, "b": accepted // 2}
+    ok = accepted == count and response_count == stored == accepted and answer_counts == expected_counts
+    print("OK" if ok else "FEHLER: Zähler weichen ab")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--url", help="laufender Server statt In-Process")
+    args = parser.parse_args()
+
+    if args.url:
+        import httpx
+        # keepalive_expiry unter dem Keep-Alive-Timeout von uvicorn (5 s), sonst werden bereits geschlossene Verbindungen wiederverwendet
+        limits = httpx.Limits(max_connections=args.concurrency, keepalive_expiry=1)
+        client = httpx.AsyncClient(base_url=args.url, timeout=120, limits=limits)
+    else:
+        client = common.asgi_client(common.load_app())
+
+    async with client:
+        ok = await run(client, args.count, args.concurrency)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Prüfung: ETag-Revalidierung der lesenden Survey-Endpunkte und Survey-Definition-Cache.
+
+    python benchmarks/etag_revalidation.py [--requests 500]
+
+Läuft im Prozess mit frischer Datenbank. Prüft, dass ein 304 keine Abfrage gegen
+responses/answers ausführt, dass Submissions und Änderungen die passenden Tags ändern
+und dass der Cache nach jeder Änderung die neue Definition liefert. Misst zum Schluss
+die Latenz von /public/surveys/{id} mit und ohne Cache.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+
+import common
+
+
+class Checks:
+    def __init__(self):
+        self.failed = 0
+
+    def expect(self, condition: bool, label: str):
+        print(f"{'ok    ' if condition else 'FEHLER'} {label}")
+        self.failed += not condition
+
+
+async def run(args) -> bool:
+    main = common.load_app()
+    from sqlalchemy import event
+
+    statements = []
+    event.listen(main.async_engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *_: statements.append(statement))
+    checks = Checks()
+    headers = {"X-Session-ID": "owner"}
+
+    async with common.asgi_client(main) as client:
+        survey = (await client.post("/surveys/", headers=headers, json={
+            "title": "ETag", "questions": [{"title": "Frage", "type": "single_choice", "options": ["a", "b"]}]
+        })).json()
+        survey_id, question_id = survey["id"], survey["questions"][0]["id"]
+        await client.put(f"/surveys/{survey_id}/status", headers=headers, params={"status": "active"})
+
+        paths = {
+            "definition": f"/public/surveys/{survey_id}",
+            "responses": f"/surveys/{survey_id}/responses/",
+            "analytics": f"/surveys/{survey_id}/analytics/",
+        }
+        tags = {}
+        for name, path in paths.items():
+            first = await client.get(path, headers=headers)
+            tags[name] = first.headers.get("etag")
+            statements.clear()
+            second = await client.get(path, headers={**headers, "If-None-Match": tags[name]})
+            touched = [s for s in statements if "responses" in s or "answer" in s]
+            checks.expect(second.status_code == 304 and not second.content and not touched,
+                          f"{name}: 304 ohne Body, {len(statements)} Statements, keins gegen responses/answers")
+
+        submit = await client.post("/responses/", json={"survey_id": survey_id, "answers": [{"question_id": question_id, "answer": "a"}]})
+        checks.expect(submit.status_code == 200, "Submission angenommen")
+        for name, path in paths.items():
+            response = await client.get(path, headers={**headers, "If-None-Match": tags[name]})
+            checks.expect(response.status_code == 200 and response.headers["etag"] != tags[name], f"{name}: neuer Tag nach Submission")
+        analytics = (await client.get(paths["analytics"])).json()
+        checks.expect(analytics["total_responses"] == 1, "analytics: total_responses passt zum neuen Tag")
+
+        old_tag = (await client.get(paths["definition"])).headers["etag"]
+        await client.put(f"/surveys/{survey_id}/questions/{question_id}", json={
+            "title": "Frage geändert", "type": "single_choice", "options": ["a", "b"]
+        })
+        response = await client.get(paths["definition"], headers={"If-None-Match": old_tag})
+        checks.expect(response.status_code == 200 and response.json()["questions"][0]["title"] == "Frage geändert",
+                      "definition: Fragenänderung liefert neuen Inhalt und Tag")
+        response = await client.get(paths["definition"], headers={"If-None-Match": 'W/"alt", ' + response.headers["etag"]})
+        checks.expect(response.status_code == 304, "definition: Tag in einer Liste mit W/ wird erkannt")
+
+        await client.put(f"/surveys/{survey_id}", headers=headers, json={"title": "ETag neu", "status": "active"})
+        checks.expect((await client.get(paths["definition"])).json()["title"] == "ETag neu", "Cache: Titeländerung sofort sichtbar")
+        await client.post(f"/surveys/{survey_id}/questions/", json={"title": "Freitext", "type": "text", "required": False})
+        checks.expect(len((await client.get(paths["definition"])).json()["questions"]) == 2, "Cache: neue Frage sofort sichtbar")
+        statements.clear()
+        sparse = (await client.get(paths["definition"], params={"fields": "status,response_count"})).json()
+        checks.expect(sparse == {"status": "active", "response_count": 1} and not statements,
+                      "Cache: Sparse Fieldset aus dem Cache ohne Abfrage")
+        await client.delete(f"/surveys/{survey_id}", headers=headers)
+        checks.expect((await client.get(paths["definition"])).status_code == 404, "Cache: gelöschte Umfrage liefert 404")
+        print(f"survey_definitions: {(await client.get('/metrics/cache')).json()['survey_definitions']}")
+
+        survey_id = (await client.post("/surveys/", headers=headers, json={
+            "title": "Latenz",
+            "questions": [{"title": f"Frage {k}", "type": "single_choice", "options": ["a", "b", "c", "d"]} for k in range(10)]
+        })).json()["id"]
+        for label, maxsize in (("ohne Cache", 0), ("mit Cache", main.survey_cache.maxsize)):
+            main.survey_cache.clear()
+            main.survey_cache.maxsize = maxsize
+            with contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                for _ in range(args.requests):
+                    await client.get(f"/public/surveys/{survey_id}")
+                elapsed = time.perf_counter() - started
+            print(f"/public/surveys/{{id}} {label:<10} {elapsed / args.requests * 1000:5.2f} ms/Request")
+
+    print("OK" if not checks.failed else f"FEHLER: {checks.failed} Prüfungen fehlgeschlagen")
+    return not checks.failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    ok = asyncio.run(run(parser.parse_args()))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: CPU-Kosten des Heartbeats bei vielen stillen Verbindungen.
+
+    python benchmarks/heartbeat.py [--sockets 10000] [--interval 1] [--window 10]
+
+Vergleicht den früheren wait_for-Timer pro Socket mit dem zentralen Timing Wheel
+(HeartbeatService). Das Intervall ist gegenüber den 30 s im Betrieb verkürzt, damit die
+Kosten sichtbar werden. Jede Variante läuft für sich, gemessen wird die Prozess-CPU-Zeit.
+"""
+import argparse
+import asyncio
+import time
+
+import common
+
+
+class IdleWebSocket:
+    """Verbindung, von der nie etwas kommt"""
+
+    def __init__(self):
+        self.heartbeats = 0
+
+    async def receive_text(self):
+        await asyncio.get_running_loop().create_future()
+
+
+async def start_wait_for(sockets, interval: float):
+    """Früheres Verhalten: jede Empfangsschleife wartet mit eigenem Timeout"""
+    async def receive_loop(websocket):
+        while True:
+            try:
+                await asyncio.wait_for(websocket.receive_text(), timeout=interval)
+            except asyncio.TimeoutError:
+                websocket.heartbeats += 1
+
+    return [asyncio.create_task(receive_loop(websocket)) for websocket in sockets]
+
+
+async def start_timing_wheel(main, sockets, interval: float):
+    """Aktuelles Verhalten: Empfangsschleifen warten ohne Timeout, der HeartbeatService prüft pro Tick"""
+    def on_due(visited, idle):
+        for websocket in idle:
+            websocket.heartbeats += 1
+
+    service = main.HeartbeatService(interval, interval / 4, on_due)
+
+    async def receive_loop(websocket):
+        while True:
+            await websocket.receive_text()
+            service.touch(websocket)
+
+    tasks = [asyncio.create_task(receive_loop(websocket)) for websocket in sockets]
+    for websocket in sockets:
+        service.register(websocket)
+    return tasks + [service.task]
+
+
+async def measure(main, variant: str, count: int, interval: float, window: float):
+    sockets = [IdleWebSocket() for _ in range(count)]
+    if variant == "wait_for":
+        tasks = await start_wait_for(sockets, interval)
+    else:
+        tasks = await start_timing_wheel(main, sockets, interval)
+
+    await asyncio.sleep(interval * 1.5)  # Einschwingen
+    cpu_started, sent_before = time.process_time(), sum(websocket.heartbeats for websocket in sockets)
+    await asyncio.sleep(window)
+    cpu = time.process_time() - cpu_started
+    sent = sum(websocket.heartbeats for websocket in sockets) - sent_before
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    expected = int(count * window / interval)
+    print(f"{variant:>12}: CPU {cpu:5.2f} s in {window:.0f} s ({100 * cpu / window:4.1f} %), "
+          f"Heartbeats {sent} von erwartet {expected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=10000)
+    parser.add_argument("--interval", type=float, default=1)
+    parser.add_argument("--window", type=float, default=10)
+    args = parser.parse_args()
+
+    app = common.load_app()
+    print(f"{args.sockets} stille Verbindungen, Heartbeat alle {args.interval} s")
+    for variant in ("wait_for", "timing_wheel"):
+        asyncio.run(measure(app, variant, args.sockets, args.interval, args.window))
+
+
+if __name__ == "__main__":
+    main()
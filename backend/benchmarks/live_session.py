@@ -0,0 +1,132 @@
+"""
+Prüfung: kompletter Live-Ablauf über WebSockets gegen einen echten uvicorn.
+
+    python benchmarks/live_session.py [--responses 100] [--port 8766]
+
+Host verbindet sich und abonniert Live-Analytics, ein Teilnehmer tritt bei, der Host startet
+die Umfrage, dann kommen parallele Submissions. Geprüft wird, dass room_update Beitritt,
+Antworten und Austritt meldet, dass die Analytics-Deltas lückenlos nummeriert sind und
+aufsummiert genau einen frischen Snapshot ergeben, und dass die REST-Zähler stimmen.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+import websockets
+
+import common
+
+
+async def receive(websocket, message_type: str, timeout: float = 5) -> dict:
+    """Nachrichten lesen, bis eine vom gewünschten Typ kommt"""
+    while True:
+        message = json.loads(await asyncio.wait_for(websocket.recv(), timeout))
+        if message["type"] == message_type:
+            return message
+
+
+def apply_delta(state: dict, delta: dict):
+    for question_id, change in delta["questions"].items():
+        question = state.setdefault(question_id, {"answers": 0, "options": {}, "ratings": {}, "rating_sum": 0, "texts": []})
+        question["answers"] += change["answers"]
+        question["rating_sum"] += change["rating_sum"]
+        question["texts"] += change["texts"]
+        for bucket in ("options", "ratings"):
+            for key, count in change[bucket].items():
+                question[bucket][key] = question[bucket].get(key, 0) + count
+
+
+async def run(port: int, responses: int) -> bool:
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        survey = (await client.post("/surveys/", headers={"X-Session-ID": "host"}, json={
+            "title": "Live",
+            "questions": [
+                {"title": "Auswahl", "type": "single_choice", "options": ["Ä", "b"]},
+                {"title": "Bewertung", "type": "rating"},
+                {"title": "Freitext", "type": "text"},
+                {"title": "Ja/Nein", "type": "yes_no"},
+            ]
+        })).json()
+        survey_id = survey["id"]
+        choice, rating, text, yes_no = (question["id"] for question in survey["questions"])
+
+        def submit(i: int):
+            return client.post("/responses/", json={"survey_id": survey_id, "answers": [
+                {"question_id": choice, "answer": "Ä"},
+                {"question_id": rating, "answer": i % 5 + 1},
+                {"question_id": text, "answer": f"Text {i}"},
+                {"question_id": yes_no, "answer": i % 2 == 0},
+            ]})
+
+        async with websockets.connect(f"{ws_url}/ws/host/{survey_id}?session_id=host") as host:
+            await receive(host, "initial_stats")
+            await host.send(json.dumps({"type": "subscribe_analytics"}))
+            snapshot = await receive(host, "analytics_snapshot")
+            state, seq = snapshot["questions"], snapshot["seq"]
+
+            async with websockets.connect(f"{ws_url}/ws/participant/{survey_id}?session_id=p1") as participant:
+                update = await receive(host, "room_update")
+                assert update["joined"] == ["p1"], update
+                await host.send(json.dumps({"type": "start_survey"}))
+                await receive(participant, "survey_started")
+                await receive(host, "survey_start_confirmed")
+
+                statuses = await asyncio.gather(*[submit(i) for i in range(responses)])
+                assert all(response.status_code == 200 for response in statuses), [r.text for r in statuses if r.status_code != 200]
+
+                # room_update und analytics_delta kommen gemischt; beides bis zur letzten Antwort mitlesen
+                new_responses, batches, response_count = 0, 0, 0
+                while new_responses < responses or response_count < responses:
+                    message = json.loads(await asyncio.wait_for(host.recv(), 5))
+                    if message["type"] == "room_update":
+                        new_responses += message["new_responses"]
+                    elif message["type"] == "analytics_delta":
+                        assert message["seq"] == seq + 1, (message["seq"], seq)
+                        seq, response_count = message["seq"], message["response_count"]
+                        apply_delta(state, message)
+                        batches += 1
+                print(f"{responses} Antworten: {batches} analytics_delta, room_update meldet {new_responses} neue Antworten")
+
+                await participant.send(json.dumps({"type": "ping"}))
+                await receive(participant, "pong")
+            update = await receive(host, "room_update")
+            assert update["left"] == ["p1"], update
+
+            await host.send(json.dumps({"type": "subscribe_analytics"}))
+            fresh = await receive(host, "analytics_snapshot")
+            for question in list(fresh["questions"].values()) + list(state.values()):
+                question["texts"].sort()
+            assert fresh["seq"] == seq and fresh["response_count"] == responses, (fresh["seq"], seq, fresh["response_count"])
+            assert fresh["questions"] == state, "Deltas ergeben nicht den Snapshot"
+
+        counts = (await client.get(f"/public/surveys/{survey_id}", params={"fields": "status,response_count"})).json()
+        assert counts == {"status": "active", "response_count": responses}, counts
+        analytics = (await client.get(f"/surveys/{survey_id}/analytics/")).json()
+        assert analytics["questions_analytics"][choice]["answer_distribution"] == {"Ä": responses}, analytics
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--responses", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    # Ohne Schonfrist meldet room_update den Austritt sofort beim Schließen
+    server = common.start_server(args.port, WS_RESUME_GRACE_SECONDS=0)
+    try:
+        asyncio.run(run(args.port, args.responses))
+        print("OK")
+    except AssertionError as e:
+        print(f"FEHLER: {e}")
+        sys.exit(1)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
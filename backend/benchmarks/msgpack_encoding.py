@@ -0,0 +1,64 @@
+"""
+Benchmark: Größe und Kodierzeit typischer WebSocket-Nachrichten als JSON und als MessagePack.
+
+    python benchmarks/msgpack_encoding.py [--repeat 20000]
+
+Braucht das Paket msgpack, orjson wird mitgemessen falls installiert.
+"""
+import argparse
+import json
+import timeit
+
+import msgpack
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MESSAGES = {
+    "room_update, 200 joins": {
+        "type": "room_update", "survey_id": "1234", "waiting_count": 1500,
+        "joined": [f"sess-{i:032x}" for i in range(200)],
+        "left": [f"sess-{i:032x}" for i in range(50)],
+        "new_responses": 120, "seq": 4711, "epoch": "ab12cd34",
+    },
+    "analytics_delta, 10 quest.": {
+        "type": "analytics_delta", "survey_id": "1234", "seq": 812, "response_count": 812, "batch_size": 40,
+        "questions": {
+            f"q{i}-{'x' * 30}": {
+                "type": "single_choice",
+                "answer_counts": {f"Option {k}": k * 3 for k in range(5)},
+                "response_count": 40,
+                "text_answers": [],
+            }
+            for i in range(10)
+        },
+    },
+}
+
+
+def per_call_us(function, repeat: int) -> float:
+    return timeit.timeit(function, number=repeat) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    print("Nachricht                     | json            | msgpack         | orjson")
+    for name, message in MESSAGES.items():
+        encoded_json = json.dumps(message, separators=(",", ":"))
+        encoded_msgpack = msgpack.packb(message)
+        line = (
+            f"{name:<29} | {len(encoded_json):5} B {per_call_us(lambda: json.dumps(message, separators=(',', ':')), args.repeat):5.1f} us "
+            f"| {len(encoded_msgpack):5} B {per_call_us(lambda: msgpack.packb(message), args.repeat):5.1f} us"
+        )
+        if orjson:
+            line += f" | {per_call_us(lambda: orjson.dumps(message), args.repeat):5.1f} us"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Prüfung: schnelle Reconnects innerhalb der Gnadenfrist (WS_RESUME_GRACE_SECONDS).
+
+    python benchmarks/reconnect_grace.py [--cycles 20] [--grace 1] [--presence memory|sqlite] [--port 8767]
+
+Ein Teilnehmer trennt und verbindet sich wiederholt kurz hintereinander. Der Host darf dabei
+weder Austritte noch erneute Beitritte sehen. Nach dem letzten Trennen muss genau ein
+participant_left ankommen (room_update.left), und der Warteraum muss leer sein.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections import Counter
+
+import httpx
+import websockets
+
+import common
+
+
+async def collect(host, seconds: float, joined: Counter, left: Counter) -> int:
+    """room_update-Nachrichten eine Weile mitlesen, letzten waiting_count zurückgeben"""
+    waiting_count = None
+    try:
+        while True:
+            message = json.loads(await asyncio.wait_for(host.recv(), seconds))
+            if message["type"] == "room_update":
+                joined.update(message["joined"])
+                left.update(message["left"])
+                waiting_count = message["waiting_count"]
+    except asyncio.TimeoutError:
+        return waiting_count
+
+
+async def run(port: int, cycles: int, grace: float) -> bool:
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        survey_id = (await client.post("/surveys/", headers={"X-Session-ID": "host"}, json={
+            "title": "Reconnect", "questions": [{"title": "Frage", "type": "text"}]
+        })).json()["id"]
+    participant_url = f"{ws_url}/ws/participant/{survey_id}?session_id=p1"
+
+    ok = True
+    async with websockets.connect(f"{ws_url}/ws/host/{survey_id}?session_id=host") as host:
+        await host.recv()  # initial_stats
+        joined, left = Counter(), Counter()
+
+        participant = await websockets.connect(participant_url)
+        await collect(host, 0.5, joined, left)
+        for _ in range(cycles):
+            await participant.close()
+            await asyncio.sleep(grace / 10)
+            participant = await websockets.connect(participant_url)
+        await collect(host, grace + 0.5, joined, left)
+        print(f"{cycles} Reconnects: joined={dict(joined)} left={dict(left)}")
+        ok &= joined == Counter({"p1": 1}) and not left
+
+        # Zwei Disconnects direkt hintereinander: nur ein Timer, nur ein Austritt
+        await participant.close()
+        participant = await websockets.connect(participant_url)
+        await participant.close()
+        waiting_count = await collect(host, grace + 1.5, joined, left)
+        print(f"nach dem letzten Trennen: left={dict(left)} waiting_count={waiting_count}")
+        ok &= left == Counter({"p1": 1}) and waiting_count == 0
+
+    print("OK" if ok else "FEHLER: unerwartete Beitritte/Austritte")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--grace", type=float, default=1)
+    parser.add_argument("--presence", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    server = common.start_server(args.port, WS_RESUME_GRACE_SECONDS=args.grace, PRESENCE_BACKEND=args.presence,
+                                 ROOM_UPDATE_INTERVAL_MS=50)
+    try:
+        ok = asyncio.run(run(args.port, args.cycles, args.grace))
+    finally:
+        server.terminate()
+        server.wait()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
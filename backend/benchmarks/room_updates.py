@@ -0,0 +1,81 @@
+"""
+Lasttest: Frames am Host, während viele Teilnehmer gleichzeitig beitreten.
+
+    python benchmarks/room_updates.py [--participants 1500] [--port 8765] [--backend PFAD]
+
+Startet uvicorn mit frischer Datenbank und zählt die Frames, die beim Host ankommen.
+Für den Vergleich mit einzelnen Nachrichten pro Ereignis --backend auf einen Checkout vor
+room_update setzen, z.B. git worktree add /tmp/quickpoll-before <commit> und
+--backend /tmp/quickpoll-before/backend.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+import websockets
+
+import common
+
+
+async def measure(port: int, participants: int) -> dict:
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        survey_id = (await client.post("/surveys/", headers={"X-Session-ID": "host"}, json={
+            "title": "Room Updates", "questions": [{"title": "Frage", "type": "text"}]
+        })).json()["id"]
+
+    frames = Counter()
+    waiting_count = None
+    async with websockets.connect(f"{ws_url}/ws/host/{survey_id}?session_id=host") as host:
+        await host.recv()  # initial_stats
+
+        async def read_host():
+            nonlocal waiting_count
+            async for message in host:
+                message = json.loads(message)
+                frames[message["type"]] += 1
+                waiting_count = message.get("waiting_count", waiting_count)
+
+        reader = asyncio.create_task(read_host())
+        started = time.perf_counter()
+        sockets = []
+        for offset in range(0, participants, 100):
+            sockets += await asyncio.gather(*[
+                websockets.connect(f"{ws_url}/ws/participant/{survey_id}?session_id=p{index}")
+                for index in range(offset, min(offset + 100, participants))
+            ])
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(1)  # letzten Tick abwarten
+
+        # Nur die Beitrittsphase zählen, Austritte beim Schließen nicht
+        reader.cancel()
+        for websocket in sockets:
+            await websocket.close()
+
+    return {"elapsed": elapsed, "frames": frames, "waiting_count": waiting_count}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--participants", type=int, default=1500)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--backend", default=common.BACKEND_DIR, help="Verzeichnis mit main.py (Standard: dieser Checkout)")
+    args = parser.parse_args()
+
+    server = common.start_server(args.port, backend_dir=args.backend)
+    try:
+        result = asyncio.run(measure(args.port, args.participants))
+    finally:
+        server.terminate()
+        server.wait()
+    total = sum(result["frames"].values())
+    print(f"{args.participants} Beitritte in {result['elapsed']:.1f} s, Host-Frames {total} ({total / result['elapsed']:.0f}/s), "
+          f"letzter waiting_count {result['waiting_count']}")
+    print("  " + ", ".join(f"{message_type}: {count}" for message_type, count in result["frames"].most_common()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Burst-Test: viele gleichzeitige GETs auf dieselbe Umfrage bei kaltem Cache.
+
+    python benchmarks/single_flight.py [--requests 300] [--without-single-flight]
+
+Zählt die SQL-Statements für /public/surveys/{id} und /surveys/{id}/analytics/. Mit
+--without-single-flight lädt jeder Request selbst (Verhalten ohne Zusammenfassen).
+"""
+import argparse
+import asyncio
+import time
+
+import common
+
+
+async def run(args):
+    main = common.load_app()
+    from sqlalchemy import event
+
+    if args.without_single_flight:
+        async def load_directly(key, load):
+            return await load()
+        main.single_flight.do = load_directly
+
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    event.listen(main.async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    async with common.asgi_client(main) as client:
+        survey = (await client.post("/surveys/", headers={"X-Session-ID": "owner"}, json={
+            "title": "Burst",
+            "questions": [
+                {"title": f"Frage {k}", "type": "single_choice", "options": ["a", "b"], "required": False}
+                for k in range(8)
+            ]
+        })).json()
+        for _ in range(20):
+            await client.post("/responses/", json={
+                "survey_id": survey["id"], "answers": [{"question_id": survey["questions"][0]["id"], "answer": "a"}]
+            })
+
+        mode = "ohne Single-Flight" if args.without_single_flight else "mit Single-Flight"
+        print(f"{args.requests} gleichzeitige GETs, kalter Cache, {mode}")
+        for label, path in (("/public/surveys/{id}", f"/public/surveys/{survey['id']}"),
+                            ("/surveys/{id}/analytics/", f"/surveys/{survey['id']}/analytics/")):
+            main.survey_cache.clear()
+            await asyncio.sleep(0.05)  # Nachzügler aus dem Setup abwarten
+            statements = 0
+            started = time.perf_counter()
+            responses = await asyncio.gather(*[client.get(path) for _ in range(args.requests)])
+            elapsed = time.perf_counter() - started
+            assert {response.status_code for response in responses} == {200}
+            assert len({response.content for response in responses}) == 1
+            print(f"{label:<26} {statements:5} SQL-Statements, {elapsed:.2f} s")
+        print(f"single_flight: {main.single_flight.metrics()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--without-single-flight", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: gleichzeitige Lese- und Schreiblast auf SQLite, altes gegen neues Storage-Profil.
+
+    python benchmarks/sqlite_profile.py [--seconds 5] [--readers 16] [--writers 4]
+
+Jedes Profil läuft in einem eigenen Prozess mit frischer Datenbank. Schreiber legen Responses
+an und zählen response_count hoch, Leser lesen Umfrage und Anzahl Responses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import common
+
+PROFILES = {
+    # Verhalten vor dem Storage-Profil: Rollback-Journal, SQLite-Standardwerte, Standard-Pool
+    "baseline": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": "0",
+        "SQLITE_CACHE_SIZE": "-2000",
+        "SQLITE_BUSY_TIMEOUT_MS": "5000",  # Standard-Timeout von sqlite3.connect
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "DB_POOL_SIZE": "5",
+        "DB_MAX_OVERFLOW": "10",
+    },
+    # Standardwerte aus main.py
+    "tuned": {},
+}
+
+
+async def workload(main, seconds: float, readers: int, writers: int) -> dict:
+    from sqlalchemy import func, select, update
+
+    async with main.AsyncSessionLocal() as db:
+        db.add(main.SurveyDB(
+            id="bench", title="Benchmark", expires_at=main.datetime.now() + main.timedelta(days=1)
+        ))
+        await db.commit()
+
+    deadline = time.perf_counter() + seconds
+    read_latencies, write_latencies = [], []
+
+    async def writer():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with main.AsyncSessionLocal() as db:
+                db.add(main.ResponseDB(id=main.generate_id(), survey_id="bench", answers=[{"question_id": "q", "answer": "a"}]))
+                await db.execute(
+                    update(main.SurveyDB).where(main.SurveyDB.id == "bench")
+                    .values(response_count=main.SurveyDB.response_count + 1)
+                )
+                await db.commit()
+            write_latencies.append(time.perf_counter() - started)
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with main.AsyncSessionLocal() as db:
+                await db.get(main.SurveyDB, "bench", populate_existing=True)
+                await db.scalar(select(func.count()).select_from(main.ResponseDB).where(main.ResponseDB.survey_id == "bench"))
+            read_latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[writer() for _ in range(writers)], *[reader() for _ in range(readers)])
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) > 1 else 0.0
+
+    return {
+        "writes_per_s": len(write_latencies) / seconds,
+        "reads_per_s": len(read_latencies) / seconds,
+        "write_p95_ms": p95(write_latencies),
+        "read_p95_ms": p95(read_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        app = common.load_app(**PROFILES[args.profile])
+        print(json.dumps(asyncio.run(workload(app, args.seconds, args.readers, args.writers))))
+        return
+
+    print(f"{args.readers} Leser, {args.writers} Schreiber, {args.seconds:.0f} s pro Profil")
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--profile", profile, "--seconds", str(args.seconds),
+             "--readers", str(args.readers), "--writers", str(args.writers)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{profile:>8}: {result['writes_per_s']:7.0f} writes/s (p95 {result['write_p95_ms']:6.1f} ms)  "
+              f"{result['reads_per_s']:7.0f} reads/s (p95 {result['read_p95_ms']:6.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
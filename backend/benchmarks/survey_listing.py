@@ -0,0 +1,66 @@
+"""
+Benchmark: Dashboard-Liste eines Besitzers mit vielen Umfragen, volle Liste gegen Sparse Fieldset und Summary.
+
+    python benchmarks/survey_listing.py [--surveys 1000] [--questions 5] [--runs 7]
+
+Läuft im Prozess mit frischer Datenbank und misst Antwortgröße und Median-Latenz.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+
+import common
+
+DASHBOARD_FIELDS = "id,title,status,created_at,expires_at,response_count"
+
+
+async def run(args):
+    main = common.load_app()
+    headers = {"X-Session-ID": "benchmark-owner"}
+    questions = [
+        {
+            "title": f"Frage {k} mit etwas längerem Titel",
+            "type": "single_choice",
+            "options": ["Option A", "Option B", "Option C", "Option D"],
+            "description": "Beschreibung der Frage",
+        }
+        for k in range(args.questions)
+    ]
+
+    async with common.asgi_client(main) as client:
+        for i in range(args.surveys):
+            response = await client.post("/surveys/", headers=headers, json={
+                "title": f"Umfrage {i}", "description": "Vorlesung Feedback", "questions": questions
+            })
+            response.raise_for_status()
+
+        print(f"{args.surveys} Umfragen x {args.questions} Fragen, Median aus {args.runs} Läufen")
+        for label, path, params in (
+            ("GET /surveys/", "/surveys/", {}),
+            ("GET /surveys/?fields=<dashboard>", "/surveys/", {"fields": DASHBOARD_FIELDS}),
+            ("GET /surveys/summary", "/surveys/summary", {}),
+        ):
+            timings = []
+            with contextlib.redirect_stdout(io.StringIO()):  # Logs von get_all_surveys
+                for _ in range(args.runs):
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers, params=params)
+                    timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+            assert len(response.json()) == args.surveys
+            print(f"{label:<34} {len(response.content) / 1024:6.0f} KiB {statistics.median(timings) * 1000:6.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--surveys", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: Zeit bis zur letzten Zustellung eines Broadcasts an 1k, 5k und 10k Teilnehmer.
+
+    python benchmarks/ws_fanout.py [--sizes 1000 5000 10000] [--slow 10] [--latency-ms 2]
+
+Die Sockets sind Attrappen im Prozess: jedes Senden dauert zufällig bis --latency-ms,
+--slow Sockets antworten nie. Verglichen wird mit dem früheren Senden Socket für Socket
+(ohne hängende Sockets, die würden dort alle folgenden endlos blockieren).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+import common
+
+
+class FakeWebSocket:
+    """Minimaler Ersatz für starlette.WebSocket: misst, wann ein Frame ankommt"""
+
+    def __init__(self, latency: float, hang: bool = False, on_delivery=None):
+        self.scope = {"subprotocols": []}
+        self.latency = latency
+        self.hang = hang
+        self.on_delivery = on_delivery
+        self.delivered_at = None
+        self.closed = asyncio.Event()
+
+    async def send_text(self, text: str):
+        if self.hang:
+            await asyncio.Event().wait()
+        await asyncio.sleep(random.uniform(0, self.latency))
+        if self.delivered_at is None:
+            self.delivered_at = time.perf_counter()
+            if self.on_delivery:
+                self.on_delivery()
+
+    async def close(self, code: int = 1000):
+        self.closed.set()
+
+
+async def sequential(sockets, text: str) -> float:
+    """Früheres Verhalten: nacheinander senden"""
+    started = time.perf_counter()
+    for websocket in sockets:
+        await websocket.send_text(text)
+    return time.perf_counter() - started
+
+
+async def fanout(main, survey_id: str, size: int, slow_count: int, latency: float) -> dict:
+    """Aktuelles Verhalten: Broadcast über den Broker in die Sende-Queues aller Verbindungen"""
+    all_delivered = asyncio.Event()
+    remaining = size
+
+    def delivered():
+        nonlocal remaining
+        remaining -= 1
+        if not remaining:
+            all_delivered.set()
+
+    sockets = [FakeWebSocket(latency, on_delivery=delivered) for _ in range(size)]
+    slow = [FakeWebSocket(latency, hang=True) for _ in range(slow_count)]
+    for index, websocket in enumerate(sockets + slow):
+        await main.ws_manager.connect(websocket, survey_id, "participant", f"p{index}")
+
+    started = time.perf_counter()
+    await main.ws_manager.broadcast_to_participants(survey_id, {"type": "survey_started", "survey_id": survey_id})
+    await all_delivered.wait()
+    last_delivery = max(websocket.delivered_at for websocket in sockets) - started
+
+    evicted_after = None
+    if slow:
+        await asyncio.gather(*[websocket.closed.wait() for websocket in slow])
+        evicted_after = time.perf_counter() - started
+
+    for websocket in sockets:
+        await main.ws_manager.disconnect(websocket)
+    return {"last_delivery": last_delivery, "evicted_after": evicted_after}
+
+
+async def run(args):
+    # Kurzer Send-Timeout, damit hängende Sockets im Benchmark schnell entfernt werden
+    main = common.load_app(WS_SEND_TIMEOUT=args.send_timeout, WS_RESUME_GRACE_SECONDS=0)
+    latency = args.latency_ms / 1000
+    text = main.OutboundFrame({"type": "survey_started", "survey_id": "bench"}).text()
+
+    print(f"Sendelatenz 0-{args.latency_ms} ms pro Socket, {args.slow} hängende Sockets, WS_SEND_TIMEOUT={args.send_timeout} s")
+    for size in args.sizes:
+        baseline = await sequential([FakeWebSocket(latency) for _ in range(size)], text)
+        # Verbindungs-Logs von main.py unterdrücken
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await fanout(main, f"bench-{size}", size, args.slow, latency)
+        line = f"{size:>6} Teilnehmer: nacheinander {baseline * 1000:8.0f} ms | parallel {result['last_delivery'] * 1000:6.0f} ms"
+        if result["evicted_after"] is not None:
+            line += f" | hängende Sockets entfernt nach {result['evicted_after']:.2f} s"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=2)
+    parser.add_argument("--send-timeout", type=float, default=1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
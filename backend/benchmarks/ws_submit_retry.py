@@ -0,0 +1,74 @@
+"""
+Prüfung: Wiederholte Abgaben über den Participant-WebSocket werden nur einmal gespeichert.
+
+    python benchmarks/ws_submit_retry.py [--port 8768]
+
+Startet uvicorn mit frischer Datenbank. Ein Teilnehmer gibt ab, trennt die Verbindung (wie nach
+einem Client-Timeout), verbindet sich mit derselben Sitzung neu und schickt dieselbe request_id
+noch einmal: er muss dieselbe Bestätigung bekommen, gespeichert wird nur eine Antwort. Eine
+ungültige Abgabe liefert submit_error, die Verbindung bleibt offen.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import httpx
+import websockets
+
+import common
+
+
+async def submit(websocket, request_id: str, answers: list) -> dict:
+    await websocket.send(json.dumps({"type": "submit", "request_id": request_id, "answers": answers}))
+    while True:
+        message = json.loads(await asyncio.wait_for(websocket.recv(), 5))
+        if message["type"] in ("submit_ack", "submit_error") and message["request_id"] == request_id:
+            return message
+
+
+async def run(port: int) -> bool:
+    base_url, ws_url = f"http://127.0.0.1:{port}", f"ws://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        survey = (await client.post("/surveys/", headers={"X-Session-ID": "host"}, json={
+            "title": "Retry", "questions": [{"title": "Frage", "type": "text", "required": True}]
+        })).json()
+        survey_id, question_id = survey["id"], survey["questions"][0]["id"]
+        answers = [{"question_id": question_id, "answer": "einmal"}]
+        participant_url = f"{ws_url}/ws/participant/{survey_id}?session_id=p1"
+
+        async with websockets.connect(participant_url) as participant:
+            first = await submit(participant, "r1", answers)
+        async with websockets.connect(participant_url) as participant:
+            retry = await submit(participant, "r1", answers)
+            invalid = await submit(participant, "r2", [])
+            await participant.send(json.dumps({"type": "ping"}))
+            still_open = json.loads(await asyncio.wait_for(participant.recv(), 5))["type"] == "pong"
+
+        response_count = (await client.get(f"/public/surveys/{survey_id}", params={"fields": "response_count"})).json()["response_count"]
+
+    print(f"erste Abgabe: {first['type']} {first.get('response_id')}")
+    print(f"Wiederholung nach Reconnect: {retry['type']} {retry.get('response_id')}")
+    print(f"ungültige Abgabe: {invalid['type']} {invalid.get('status')}, Verbindung danach {'offen' if still_open else 'GESCHLOSSEN'}")
+    print(f"gespeicherte Antworten: {response_count}")
+    return (first["type"] == retry["type"] == "submit_ack" and first["response_id"] == retry["response_id"]
+            and invalid["type"] == "submit_error" and still_open and response_count == 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    server = common.start_server(args.port)
+    try:
+        ok = asyncio.run(run(args.port))
+    finally:
+        server.terminate()
+        server.wait()
+    print("OK" if ok else "FEHLER")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
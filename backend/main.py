@@ -1,17 +1,22 @@
-from fastapi import FastAPI, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse, Response as HTTPResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Dict, Set, Any, AsyncIterator
 from datetime import datetime, timedelta
 from enum import Enum
+from collections import deque, OrderedDict
 import uuid
 import json
 import random
 import os
-import tempfile
+import time
 import asyncio
+import io
+import csv
+import threading
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 
@@ -21,6 +26,320 @@ class SurveyStatus(str, Enum):
     ACTIVE = "active"  # Aktiv / Live
     FINISHED = "finished"  # Umfrage beendet
 
+# Optionaler schnellerer JSON-Encoder für WebSocket-Nachrichten
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optionales Binärformat für WebSocket-Clients, die das Subprotokoll quickpoll.msgpack aushandeln
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_SUBPROTOCOL = "quickpoll.msgpack"
+
+# Dateisperren für die Hub-Wahl des Unix-Socket-Brokers (nicht unter Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+def encode_message(message: dict) -> str:
+    """WebSocket-Nachricht zu einem Text-Frame kodieren (einmal pro Broadcast, nicht pro Empfänger)"""
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message, separators=(",", ":"))
+
+class OutboundFrame:
+    """
+    Ausgehende WebSocket-Nachricht, die je Format höchstens einmal kodiert wird
+    (JSON-Text oder MessagePack), egal an wie viele Empfänger sie geht.
+    """
+    __slots__ = ("message", "type", "_text", "_binary", "_event")
+    
+    def __init__(self, message: dict):
+        self.message = message
+        self.type = message.get("type", "")
+        self._text: Optional[str] = None
+        self._binary: Optional[bytes] = None
+        self._event: Optional[bytes] = None
+    
+    def text(self) -> str:
+        if self._text is None:
+            self._text = encode_message(self.message)
+        return self._text
+    
+    def binary(self) -> bytes:
+        if self._binary is None:
+            self._binary = msgpack.packb(self.message)
+        return self._binary
+    
+    def event(self) -> bytes:
+        """Server-Sent Event; nummerierte Broadcasts bekommen die ID epoch:seq für Last-Event-ID"""
+        if self._event is None:
+            event_id = ""
+            if "epoch" in self.message:
+                event_id = f"id: {self.message['epoch']}:{self.message['seq']}\n"
+            self._event = f"{event_id}event: {self.type}\ndata: {self.text()}\n\n".encode()
+        return self._event
+
+# Konstante Frames für die Keep-Alive Nachrichten
+PONG_FRAME = OutboundFrame({"type": "pong"})
+HEARTBEAT_FRAME = OutboundFrame({"type": "heartbeat"})
+
+def negotiate_subprotocol(websocket: WebSocket) -> Optional[str]:
+    """quickpoll.msgpack annehmen, wenn der Client es anbietet und msgpack installiert ist, sonst JSON"""
+    if msgpack is not None and MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+        return MSGPACK_SUBPROTOCOL
+    return None
+
+async def receive_message(websocket: WebSocket) -> dict:
+    """Nächste Client-Nachricht lesen, als JSON-Text oder (bei quickpoll.msgpack) als Binär-Frame"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("bytes") is not None:
+        if msgpack is None:
+            raise ValueError("Binär-Frames werden nicht unterstützt")
+        return msgpack.unpackb(message["bytes"])
+    return json.loads(message["text"])
+
+# Maximale Zeit für ein einzelnes Senden, danach wird der Socket entfernt
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "5"))
+
+# Heartbeat an Verbindungen, von denen so lange nichts kam; Auflösung des Timing Wheels
+HEARTBEAT_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_INTERVAL_SECONDS", "30"))
+HEARTBEAT_WHEEL_RESOLUTION = float(os.getenv("HEARTBEAT_WHEEL_RESOLUTION", "1"))
+
+# Ausgehende Queue pro Verbindung und Verhalten bei Überlauf
+# drop_oldest: älteste unkritische Nachricht verwerfen
+# coalesce: ältere Nachrichten desselben Typs durch die neueste ersetzen
+# disconnect: Verbindung trennen
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+
+# Wiederaufnahme nach kurzen Verbindungsabbrüchen: Gnadenfrist und Länge des Replay-Puffers pro Umfrage
+WS_RESUME_GRACE_SECONDS = float(os.getenv("WS_RESUME_GRACE_SECONDS", "10"))
+WS_REPLAY_BUFFER_SIZE = int(os.getenv("WS_REPLAY_BUFFER_SIZE", "256"))
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "drop_oldest")
+
+# Takt, in dem Raum-Ereignisse (Beitritte, Austritte, Antworten) gesammelt an Hosts gehen
+ROOM_UPDATE_INTERVAL_MS = int(os.getenv("ROOM_UPDATE_INTERVAL_MS", "250"))
+
+# Zuletzt bestätigte WebSocket-Abgaben (survey_id, session_id, request_id), Wiederholungen werden nicht erneut gespeichert
+WS_SUBMIT_DEDUPE_SIZE = int(os.getenv("WS_SUBMIT_DEDUPE_SIZE", "10000"))
+
+# Nachrichten, die bei Überlauf nie verworfen werden
+CRITICAL_MESSAGE_TYPES = {
+    "initial_stats",
+    "analytics_snapshot",
+    "survey_started",
+    "survey_finished",
+    "survey_start_confirmed",
+    "survey_end_confirmed",
+    "submit_ack",
+    "submit_error",
+}
+
+class ConnectionSender:
+    """
+    Begrenzte Sende-Queue einer WebSocket-Verbindung, abgearbeitet von einem eigenen Writer-Task.
+    Ohne WebSocket (Unterklassen wie SSE) gibt es keinen Writer-Task, der Leser holt die Frames selbst ab.
+    """
+    
+    def __init__(self, manager: "WebSocketManager", websocket: Optional[WebSocket], maxsize: int, policy: str, binary: bool = False):
+        self.manager = manager
+        self.websocket = websocket
+        self.maxsize = maxsize
+        self.policy = policy
+        self.binary = binary  # MessagePack statt JSON-Text
+        self.queue: deque = deque()  # (message_type, frame)
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run()) if websocket is not None else None
+    
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+    
+    def enqueue(self, message_type: str, frame: OutboundFrame) -> bool:
+        """Frame nicht-blockierend einreihen. False bedeutet: Verbindung soll getrennt werden."""
+        if len(self.queue) >= self.maxsize and not self._make_room(message_type):
+            return False
+        self.queue.append((message_type, frame))
+        self.wakeup.set()
+        return True
+    
+    def _make_room(self, message_type: str) -> bool:
+        """Platz in einer vollen Queue schaffen, je nach Policy"""
+        if self.policy == "disconnect":
+            return False
+        
+        if self.policy == "coalesce" and message_type not in CRITICAL_MESSAGE_TYPES:
+            remaining = deque(entry for entry in self.queue if entry[0] != message_type)
+            coalesced = len(self.queue) - len(remaining)
+            if coalesced:
+                self.queue = remaining
+                self.manager.stats["coalesced_messages"] += coalesced
+                return True
+        
+        # Älteste unkritische Nachricht verwerfen
+        for index, (queued_type, _) in enumerate(self.queue):
+            if queued_type not in CRITICAL_MESSAGE_TYPES:
+                del self.queue[index]
+                self.manager.stats["dropped_messages"] += 1
+                return True
+        
+        return False
+    
+    async def _run(self):
+        while True:
+            while not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            
+            _, frame = self.queue.popleft()
+            try:
+                if self.binary:
+                    await asyncio.wait_for(self.websocket.send_bytes(frame.binary()), timeout=WS_SEND_TIMEOUT)
+                else:
+                    await asyncio.wait_for(self.websocket.send_text(frame.text()), timeout=WS_SEND_TIMEOUT)
+            except Exception:
+                # Eviction in eigenem Task, da disconnect() diesen Writer-Task beendet
+                self.manager.spawn(self.manager._evict(self.websocket))
+                return
+    
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+
+class EventStreamSubscriber(ConnectionSender):
+    """
+    Nur-Lese-Zuschauer per Server-Sent Events (Beamer, Zweitgeräte). Gleiche begrenzte Queue und
+    Überlauf-Policy wie bei WebSockets, die Frames holt aber die StreamingResponse ab.
+    """
+    
+    def __init__(self, manager: "WebSocketManager", survey_id: str, maxsize: int, policy: str):
+        super().__init__(manager, None, maxsize, policy)
+        self.survey_id = survey_id
+        self.closed = False
+    
+    def enqueue(self, message_type: str, frame: OutboundFrame) -> bool:
+        if not super().enqueue(message_type, frame):
+            # Policy disconnect: Stream beenden, der Client verbindet sich mit Last-Event-ID neu
+            self.closed = True
+            self.wakeup.set()
+            return False
+        return True
+    
+    async def next_frame(self, timeout: float) -> Optional[OutboundFrame]:
+        """Nächsten Frame abholen, None nach timeout (dann Keep-Alive-Kommentar senden)"""
+        if not self.queue and not self.closed:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self.queue:
+            return None
+        return self.queue.popleft()[1]
+    
+    def close(self):
+        self.closed = True
+
+class HeartbeatService:
+    """
+    Zentraler Heartbeat für alle WebSocket-Verbindungen (Timing Wheel statt wait_for pro Socket).
+    Empfangene Nachrichten setzen nur last_seen. Erst wenn der Slot einer Verbindung fällig ist,
+    wird geprüft: aktive Verbindungen werden neu einsortiert, stille bekommen einen Heartbeat.
+    """
+    
+    def __init__(self, interval: float, resolution: float, on_due):
+        self.interval = interval
+        self.resolution = resolution
+        self.on_due = on_due  # on_due(visited, idle): pro Tick einmal mit allen fälligen Verbindungen
+        self.slots: List[Set[WebSocket]] = [set() for _ in range(int(interval / resolution) + 2)]
+        self.position = 0
+        self.last_seen: Dict[WebSocket, float] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.task is None or self.task.done():
+            self.loop = loop
+            self.task = loop.create_task(self._run())
+    
+    def register(self, websocket: WebSocket):
+        self._ensure_started()
+        now = self.loop.time()
+        self.last_seen[websocket] = now
+        self._schedule(websocket, now + self.interval)
+    
+    def touch(self, websocket: WebSocket):
+        """Aktivität vermerken (O(1), kein Umsortieren)"""
+        if websocket in self.last_seen:
+            self.last_seen[websocket] = self.loop.time()
+    
+    def unregister(self, websocket: WebSocket):
+        # Eintrag im Slot wird beim nächsten Tick übersprungen
+        self.last_seen.pop(websocket, None)
+    
+    def _schedule(self, websocket: WebSocket, due: float):
+        ticks = max(1, min(len(self.slots) - 1, -(-(due - self.loop.time()) // self.resolution)))
+        self.slots[(self.position + int(ticks)) % len(self.slots)].add(websocket)
+    
+    async def _run(self):
+        next_tick = self.loop.time()
+        while True:
+            next_tick += self.resolution
+            await asyncio.sleep(max(0, next_tick - self.loop.time()))
+            
+            self.position = (self.position + 1) % len(self.slots)
+            due, self.slots[self.position] = self.slots[self.position], set()
+            if not due:
+                continue
+            
+            now = self.loop.time()
+            visited, idle = [], []
+            for websocket in due:
+                last_seen = self.last_seen.get(websocket)
+                if last_seen is None:
+                    continue
+                visited.append(websocket)
+                if now - last_seen >= self.interval:
+                    idle.append(websocket)
+                    self._schedule(websocket, now + self.interval)
+                else:
+                    self._schedule(websocket, last_seen + self.interval)
+            
+            try:
+                self.on_due(visited, idle)
+            except Exception as e:
+                print(f"Error in heartbeat tick: {e}")
+
+class ReplayBuffer:
+    """Ringpuffer der zuletzt nummerierten Broadcasts einer Umfrage (für Wiederaufnahme mit last_seq)"""
+    
+    def __init__(self, epoch: str, size: int):
+        self.epoch = epoch
+        self.entries: deque = deque(maxlen=size)  # (seq, role, message_type, frame)
+        self.last_seq = 0
+    
+    def append(self, seq: int, role: str, message_type: str, frame: OutboundFrame):
+        self.entries.append((seq, role, message_type, frame))
+        self.last_seq = seq
+    
+    def since(self, epoch: Optional[str], last_seq: int, role: str) -> Optional[List[tuple]]:
+        """Verpasste (message_type, frame) seit last_seq, None wenn keine lückenlose Wiederholung möglich ist"""
+        if epoch != self.epoch:
+            return None
+        if last_seq >= self.last_seq:
+            return []
+        if not self.entries or self.entries[0][0] > last_seq + 1:
+            return None
+        return [(message_type, frame) for seq, entry_role, message_type, frame in self.entries if seq > last_seq and entry_role == role]
+
 # WebSocket Connection Manager
 class WebSocketManager:
     def __init__(self):
@@ -28,9 +347,29 @@ class WebSocketManager:
         self.connections: Dict[str, Dict[str, List[WebSocket]]] = {}
         # websocket -> {"survey_id": str, "role": str, "session_id": str}
         self.connection_info: Dict[WebSocket, Dict[str, str]] = {}
+        # websocket -> ausgehende Queue
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
+        self.stats = {"dropped_messages": 0, "coalesced_messages": 0, "overflow_disconnects": 0}
+        self.background_tasks = set()
+        # survey_id -> gesammelte Raum-Ereignisse bis zum nächsten Tick
+        self.pending_room_updates: Dict[str, dict] = {}
+        # Hosts mit Live-Analytics-Abo -> None (aktiv) oder gepufferte Deltas bis der Snapshot gesendet ist
+        self.analytics_subscriptions: Dict[WebSocket, Optional[List[dict]]] = {}
+        self.heartbeats = HeartbeatService(HEARTBEAT_INTERVAL_SECONDS, HEARTBEAT_WHEEL_RESOLUTION, self._on_heartbeat_due)
+        # survey_id -> zuletzt nummerierte Broadcasts
+        self.replay_buffers: Dict[str, ReplayBuffer] = {}
+        # survey_id -> SSE-Zuschauer, bekommen alles, was an Hosts geht
+        self.event_streams: Dict[str, Set[EventStreamSubscriber]] = {}
+        # (survey_id, session_id) -> laufende Gnadenfrist nach einem Participant-Disconnect
+        self.leave_timers: Dict[tuple, asyncio.Task] = {}
+        # (survey_id, session_id, request_id) -> Future mit dem submit_ack (None, falls die Abgabe fehlschlug)
+        self.recent_submits: OrderedDict = OrderedDict()
         
     async def connect(self, websocket: WebSocket, survey_id: str, role: str, session_id: str):
         """WebSocket-Verbindung hinzufügen"""        
+        # Ereignisse anderer Worker empfangen, auch wenn dieser Prozess selbst noch nichts veröffentlicht hat
+        broker.ensure_started()
+        
         if survey_id not in self.connections:
             self.connections[survey_id] = {"hosts": [], "participants": []}
             
@@ -40,18 +379,24 @@ class WebSocketManager:
             "role": role,
             "session_id": session_id
         }
+        binary = negotiate_subprotocol(websocket) == MSGPACK_SUBPROTOCOL
+        self.senders[websocket] = ConnectionSender(self, websocket, WS_SEND_QUEUE_SIZE, WS_OVERFLOW_POLICY, binary)
+        self.heartbeats.register(websocket)
+        if role == "participant":
+            # Wiederaufnahme innerhalb der Gnadenfrist: kein participant_left mehr
+            self._cancel_leave_timer(survey_id, session_id)
         
         print(f"WebSocket connected: {role} for survey {survey_id}")
         
         # Initial Stats senden (ohne sofortiges Participant-Tracking)
         if role == "host":
             try:
-                waiting_count = get_waiting_participants_count(survey_id)
-                await websocket.send_text(json.dumps({
+                waiting_count = await get_waiting_participants_count(survey_id)
+                await self.send(websocket, {
                     "type": "initial_stats",
                     "survey_id": survey_id,
                     "waiting_count": waiting_count
-                }))
+                })
             except Exception as e:
                 print(f"Error sending initial stats: {e}")
         
@@ -74,55 +419,278 @@ class WebSocketManager:
                 role_list.remove(websocket)
                 
         del self.connection_info[websocket]
+        self.analytics_subscriptions.pop(websocket, None)
+        self.heartbeats.unregister(websocket)
+        sender = self.senders.pop(websocket, None)
+        if sender:
+            sender.close()
         
-        # Bei Participant-Trennung aus Warteraum entfernen
+        # Bei Participant-Trennung aus Warteraum entfernen, mit Gnadenfrist für eine Wiederaufnahme
         if role == "participant":
-            track_participant_leave(survey_id, session_id)
-            await self.broadcast_to_hosts(survey_id, {
-                "type": "participant_left",
-                "survey_id": survey_id,
-                "session_id": session_id,
-                "waiting_count": get_waiting_participants_count(survey_id)
-            })
+            # Höchstens ein Timer pro Sitzung: ein erneuter Disconnect startet die Frist neu
+            self._cancel_leave_timer(survey_id, session_id)
+            if WS_RESUME_GRACE_SECONDS > 0:
+                # Eine Sekunde Reserve, damit Lazy Expiry den Eintrag nicht vor dem Timer entfernt
+                lingering_until = await presence_store.linger(survey_id, session_id, WS_RESUME_GRACE_SECONDS + 1)
+                self.leave_timers[(survey_id, session_id)] = self.spawn(
+                    self._leave_after_grace(survey_id, session_id, lingering_until)
+                )
+            else:
+                await self._participant_left(survey_id, session_id)
         
         print(f"WebSocket disconnected: {role} from survey {survey_id}")
     
-    async def broadcast_to_hosts(self, survey_id: str, message: dict):
-        """Nachricht an alle Hosts einer Umfrage senden"""
-        if survey_id not in self.connections:
+    async def _participant_left(self, survey_id: str, session_id: str, lingering_until: Optional[float] = None):
+        # Nur melden, wenn dieser Aufruf den Eintrag entfernt hat (kein doppeltes participant_left)
+        if await track_participant_leave(survey_id, session_id, lingering_until):
+            self.publish_room_event(survey_id, "participant_left", session_id=session_id)
+    
+    async def _leave_after_grace(self, survey_id: str, session_id: str, lingering_until: float):
+        """Nach der Gnadenfrist als gegangen zählen, falls sich die Sitzung nicht (in irgendeinem Worker) neu verbunden hat"""
+        await asyncio.sleep(WS_RESUME_GRACE_SECONDS)
+        # Ab hier nicht mehr abbrechbar, das Entfernen soll nicht halb passieren
+        if self.leave_timers.get((survey_id, session_id)) is asyncio.current_task():
+            del self.leave_timers[(survey_id, session_id)]
+        await self._participant_left(survey_id, session_id, lingering_until)
+    
+    def _cancel_leave_timer(self, survey_id: str, session_id: str):
+        timer = self.leave_timers.pop((survey_id, session_id), None)
+        if timer is not None:
+            timer.cancel()
+    
+    async def replay(self, websocket: WebSocket, survey_id: str, role: str, epoch: Optional[str], last_seq: int):
+        """Verpasste Broadcasts seit last_seq erneut senden, sonst den Client zum Neuladen auffordern"""
+        buffer = self.replay_buffers.get(survey_id)
+        missed = buffer.since(epoch, last_seq, role) if buffer else None
+        if missed is None:
+            await self.send(websocket, {"type": "resync_required", "survey_id": survey_id})
             return
-            
-        hosts = self.connections[survey_id]["hosts"].copy()
         
-        dead_connections = []
+        for message_type, frame in missed:
+            self._enqueue(websocket, message_type, frame)
+        await self.send(websocket, {"type": "session_resumed", "survey_id": survey_id, "replayed": len(missed)})
+    
+    def touch(self, websocket: WebSocket):
+        """Empfangene Nachricht vermerken (verschiebt den nächsten Heartbeat)"""
+        self.heartbeats.touch(websocket)
+    
+    def _on_heartbeat_due(self, visited: List[WebSocket], idle: List[WebSocket]):
+        """Heartbeat-Tick: stille Verbindungen anpingen, Präsenz aller fälligen Teilnehmer gebündelt verlängern"""
+        for websocket in idle:
+            self._enqueue(websocket, "heartbeat", HEARTBEAT_FRAME)
         
-        for host_ws in hosts:
-            try:
-                await host_ws.send_text(json.dumps(message))
-            except:
-                dead_connections.append(host_ws)
+        entries = []
+        for websocket in visited:
+            info = self.connection_info.get(websocket)
+            if info and info["role"] == "participant":
+                entries.append((info["survey_id"], info["session_id"]))
+        if entries:
+            self.spawn(refresh_participant_presence(entries))
+    
+    def remember_submit(self, key: tuple, result: asyncio.Future):
+        """Abgabe für die Erkennung von Wiederholungen merken (LRU, höchstens WS_SUBMIT_DEDUPE_SIZE)"""
+        self.recent_submits[key] = result
+        self.recent_submits.move_to_end(key)
+        while len(self.recent_submits) > WS_SUBMIT_DEDUPE_SIZE:
+            self.recent_submits.popitem(last=False)
+    
+    def spawn(self, coroutine):
+        """Hintergrund-Task starten und Referenz halten bis er fertig ist"""
+        task = asyncio.create_task(coroutine)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+    
+    async def _evict(self, websocket: WebSocket):
+        """Verbindung entfernen und schließen (Client darf sich neu verbinden)"""
+        await self.disconnect(websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=1013), timeout=WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+    
+    def _enqueue(self, websocket: WebSocket, message_type: str, frame: OutboundFrame) -> bool:
+        """Frame in die Queue einer Verbindung legen, bei Überlauf gemäß Policy trennen"""
+        sender = self.senders.get(websocket)
+        if sender is None:
+            return False
+        if not sender.enqueue(message_type, frame):
+            self.stats["overflow_disconnects"] += 1
+            self.spawn(self._evict(websocket))
+            return False
+        return True
+    
+    async def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Einzelne Nachricht an eine Verbindung senden (über deren Queue)"""
+        frame = OutboundFrame(message)
+        return self._enqueue(websocket, frame.type, frame)
+    
+    async def send_frame(self, websocket: WebSocket, message_type: str, frame: OutboundFrame) -> bool:
+        """Vorkodierten Frame an eine Verbindung senden (über deren Queue)"""
+        return self._enqueue(websocket, message_type, frame)
+    
+    async def _broadcast(self, survey_id: str, role: str, message: dict):
+        """Nachricht über den Broker an alle Verbindungen einer Rolle senden (in allen Worker-Prozessen)"""
+        broker.publish({"op": "broadcast", "survey_id": survey_id, "role": role, "message": message})
+    
+    def deliver_broadcast(self, event: dict):
+        """Vom Broker nummerierten Broadcast lokal zustellen und im Replay-Puffer der Umfrage ablegen"""
+        survey_id, role = event["survey_id"], event["role"]
+        frame = OutboundFrame({**event["message"], "seq": event["seq"], "epoch": event["epoch"]})
+        message_type = frame.type
         
-        # Tote Verbindungen entfernen
-        for dead_ws in dead_connections:
-            await self.disconnect(dead_ws)
+        buffer = self.replay_buffers.get(survey_id)
+        if buffer is None or buffer.epoch != event["epoch"]:
+            buffer = self.replay_buffers[survey_id] = ReplayBuffer(event["epoch"], WS_REPLAY_BUFFER_SIZE)
+        buffer.append(event["seq"], role, message_type, frame)
+        
+        for websocket in self.connections.get(survey_id, {}).get(f"{role}s", []).copy():
+            self._enqueue(websocket, message_type, frame)
+        if role == "host":
+            self._stream_to_viewers(survey_id, frame)
     
-    async def broadcast_to_participants(self, survey_id: str, message: dict):
-        """Nachricht an alle Teilnehmer einer Umfrage senden"""
-        if survey_id not in self.connections:
+    def deliver(self, survey_id: str, role: str, message: dict):
+        """Nachricht in die Queues der lokalen Verbindungen einer Rolle legen (blockiert nicht)"""
+        if survey_id not in self.connections and survey_id not in self.event_streams:
             return
-            
-        participants = self.connections[survey_id]["participants"].copy()
-        dead_connections = []
         
-        for participant_ws in participants:
-            try:
-                await participant_ws.send_text(json.dumps(message))
-            except:
-                dead_connections.append(participant_ws)
+        frame = self._send_to(self.connections.get(survey_id, {}).get(f"{role}s", []).copy(), message)
+        if role == "host":
+            self._stream_to_viewers(survey_id, frame or OutboundFrame(message))
+    
+    def _stream_to_viewers(self, survey_id: str, frame: OutboundFrame):
+        """Host-Nachricht an die SSE-Zuschauer einer Umfrage (gleicher Frame, einmal als Event kodiert)"""
+        for subscriber in self.event_streams.get(survey_id, ()):
+            subscriber.enqueue(frame.type, frame)
+    
+    def open_event_stream(self, survey_id: str) -> EventStreamSubscriber:
+        subscriber = EventStreamSubscriber(self, survey_id, WS_SEND_QUEUE_SIZE, WS_OVERFLOW_POLICY)
+        self.event_streams.setdefault(survey_id, set()).add(subscriber)
+        return subscriber
+    
+    def close_event_stream(self, subscriber: EventStreamSubscriber):
+        subscriber.close()
+        streams = self.event_streams.get(subscriber.survey_id)
+        if streams is not None:
+            streams.discard(subscriber)
+            if not streams:
+                del self.event_streams[subscriber.survey_id]
+    
+    def _send_to(self, targets: List[WebSocket], message: dict) -> Optional[OutboundFrame]:
+        """Nachricht einmal kodieren und in die Queues aller Ziele legen"""
+        if not targets:
+            return None
+        
+        # Einmal pro Format kodieren, derselbe Frame geht an alle Empfänger
+        frame = OutboundFrame(message)
+        
+        for websocket in targets:
+            self._enqueue(websocket, frame.type, frame)
+        return frame
+    
+    def publish_analytics_delta(self, survey_id: str, message: dict):
+        """Analytics-Delta über den Broker an alle abonnierten Hosts einer Umfrage senden"""
+        broker.publish({"op": "analytics_delta", "survey_id": survey_id, "message": message})
+    
+    def deliver_analytics_delta(self, survey_id: str, message: dict):
+        """Analytics-Delta an lokale Abonnenten senden bzw. puffern, solange deren Snapshot noch lädt"""
+        targets = []
+        for websocket in self.connections.get(survey_id, {}).get("hosts", []):
+            if websocket not in self.analytics_subscriptions:
+                continue
+            buffered = self.analytics_subscriptions[websocket]
+            if buffered is None:
+                targets.append(websocket)
+            else:
+                buffered.append(message)
+        
+        self._send_to(targets, message)
+    
+    def publish_room_event(self, survey_id: str, event_type: str, **fields):
+        """Raum-Ereignis über den Broker an alle Worker verteilen"""
+        broker.publish({"op": "room_event", "survey_id": survey_id, "event_type": event_type, "fields": fields})
+    
+    def buffer_room_event(self, survey_id: str, event_type: str, fields: dict):
+        """Raum-Ereignis für lokale Hosts vormerken, wird pro Tick als ein room_update gesendet"""
+        if not self.connections.get(survey_id, {}).get("hosts") and survey_id not in self.event_streams:
+            return
+        
+        pending = self.pending_room_updates.get(survey_id)
+        if pending is None:
+            pending = {"joined": [], "left": [], "new_responses": 0, "events": 0}
+            self.pending_room_updates[survey_id] = pending
+            if ROOM_UPDATE_INTERVAL_MS > 0:
+                self.spawn(self._flush_room_update_later(survey_id))
+        
+        pending["events"] += 1
+        if event_type == "participant_joined":
+            pending["joined"].append(fields["session_id"])
+        elif event_type == "participant_left":
+            # Beitritt und Austritt im selben Tick heben sich auf
+            if fields["session_id"] in pending["joined"]:
+                pending["joined"].remove(fields["session_id"])
+            else:
+                pending["left"].append(fields["session_id"])
+        elif event_type == "response_submitted":
+            pending["new_responses"] += fields["batch_size"]
+            pending["response_count"] = fields["response_count"]
+            pending["last_response"] = {
+                "participant_name": fields["participant_name"],
+                "submitted_at": fields["submitted_at"]
+            }
+        
+        if ROOM_UPDATE_INTERVAL_MS <= 0:
+            self.spawn(self.flush_room_update(survey_id))
+    
+    async def _flush_room_update_later(self, survey_id: str):
+        await asyncio.sleep(ROOM_UPDATE_INTERVAL_MS / 1000)
+        await self.flush_room_update(survey_id)
+    
+    async def flush_room_update(self, survey_id: str):
+        """Gesammelte Raum-Ereignisse als ein room_update an alle Hosts senden"""
+        pending = self.pending_room_updates.pop(survey_id, None)
+        if pending is None:
+            return
+        
+        # Zähler zum Sendezeitpunkt, Deltas aus dem Tick (nur lokal, jeder Worker sammelt selbst)
+        self.deliver(survey_id, "host", {
+            "type": "room_update",
+            "survey_id": survey_id,
+            "waiting_count": await get_waiting_participants_count(survey_id),
+            **pending
+        })
+    
+    def queue_metrics(self) -> dict:
+        """Queue-Tiefen und Überlauf-Zähler für das Monitoring"""
+        depths = [sender.depth for sender in self.senders.values()]
+        surveys = {}
+        for survey_id, roles in self.connections.items():
+            survey_depths = [self.senders[ws].depth for ws in roles["hosts"] + roles["participants"] if ws in self.senders]
+            surveys[survey_id] = {
+                "hosts": len(roles["hosts"]),
+                "participants": len(roles["participants"]),
+                "queued_messages": sum(survey_depths),
+                "max_queue_depth": max(survey_depths, default=0)
+            }
         
-        # Tote Verbindungen entfernen
-        for dead_ws in dead_connections:
-            await self.disconnect(dead_ws)
+        return {
+            "connections": len(self.senders),
+            "event_streams": sum(len(streams) for streams in self.event_streams.values()),
+            "queue_size": WS_SEND_QUEUE_SIZE,
+            "overflow_policy": WS_OVERFLOW_POLICY,
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            **self.stats,
+            "surveys": surveys
+        }
+    
+    async def broadcast_to_hosts(self, survey_id: str, message: dict):
+        """Nachricht an alle Hosts einer Umfrage senden"""
+        await self._broadcast(survey_id, "host", message)
+    
+    async def broadcast_to_participants(self, survey_id: str, message: dict):
+        """Nachricht an alle Teilnehmer einer Umfrage senden"""
+        await self._broadcast(survey_id, "participant", message)
     
     async def broadcast_to_all(self, survey_id: str, message: dict):
         """Nachricht an alle Verbindungen einer Umfrage senden"""
@@ -132,51 +700,534 @@ class WebSocketManager:
 # Globaler WebSocket Manager
 ws_manager = WebSocketManager()
 
-# In-Memory Teilnehmer-Tracking
-participant_tracker = {}  # survey_id -> set of session_ids
+# Teilnehmer-Präsenz mit Ablaufzeit (TTL), wird durch Heartbeats verlängert
+# memory: im Speicher, Änderungen laufen über den Broker (jeder Worker hält ein Replikat)
+# sqlite: gemeinsame Tabelle participant_presence, übersteht Neustarts
+PRESENCE_BACKEND = os.getenv("PRESENCE_BACKEND", "memory")
+PRESENCE_TTL_SECONDS = float(os.getenv("PRESENCE_TTL_SECONDS", "90"))
+
+class MemoryPresenceStore:
+    """
+    Präsenz-Replikat im Speicher.
+    Einträge pro Umfrage sind nach Ablaufzeit sortiert: Lazy Expiry räumt nur den Anfang ab, Zählen ist O(1).
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.surveys: Dict[str, OrderedDict] = {}  # survey_id -> session_id -> expires_at
+    
+    async def join(self, survey_id: str, session_id: str):
+        broker.publish({"op": "join", "survey_id": survey_id, "session_id": session_id, "expires_at": time.time() + self.ttl})
+    
+    async def refresh(self, entries: List[tuple]):
+        broker.publish({"op": "refresh", "entries": entries, "expires_at": time.time() + self.ttl})
+    
+    async def linger(self, survey_id: str, session_id: str, seconds: float) -> float:
+        # Verkürzte Ablaufzeit nach einem Disconnect; der Eintrag steht damit außerhalb der Sortierung,
+        # das explizite leave nach der Gnadenfrist entfernt ihn
+        expires_at = time.time() + seconds
+        broker.publish({"op": "refresh", "entries": [(survey_id, session_id)], "expires_at": expires_at})
+        return expires_at
+    
+    async def contains(self, survey_id: str, session_id: str) -> bool:
+        return self.surveys.get(survey_id, {}).get(session_id, 0) > time.time()
+    
+    async def leave(self, survey_id: str, session_id: str, lingering_until: Optional[float] = None) -> bool:
+        # Entscheidung auf dem Replikat: nicht (mehr) vorhanden oder seit dem linger verlängert -> nichts zu tun
+        expires_at = self.surveys.get(survey_id, {}).get(session_id)
+        if expires_at is None or (lingering_until is not None and expires_at > lingering_until):
+            return False
+        broker.publish({"op": "leave", "survey_id": survey_id, "session_id": session_id})
+        return True
+    
+    async def clear(self, survey_id: str):
+        broker.publish({"op": "clear", "survey_id": survey_id})
+    
+    async def count(self, survey_id: str) -> int:
+        self._expire(survey_id)
+        return len(self.surveys.get(survey_id, ()))
+    
+    def apply(self, event: dict):
+        """Präsenz-Ereignis vom Broker auf das Replikat anwenden"""
+        op = event["op"]
+        
+        if op in ("join", "refresh"):
+            for survey_id, session_id in presence_entries(event):
+                sessions = self.surveys.setdefault(survey_id, OrderedDict())
+                is_new = session_id not in sessions
+                sessions[session_id] = event["expires_at"]
+                sessions.move_to_end(session_id)
+                if op == "join" and is_new:
+                    print(f"Participant {session_id} joined survey {survey_id}. Total waiting: {len(sessions)}")
+        
+        elif op == "leave":
+            sessions = self.surveys.get(event["survey_id"])
+            if sessions and sessions.pop(event["session_id"], None) is not None:
+                if not sessions:
+                    del self.surveys[event["survey_id"]]
+                print(f"Participant {event['session_id']} left survey {event['survey_id']}")
+        
+        elif op == "clear":
+            if self.surveys.pop(event["survey_id"], None) is not None:
+                print(f"Cleared all waiting participants for survey {event['survey_id']}")
+        
+        elif op == "presence_snapshot":
+            # Neuer Hub: Replikat mit dem ersten Teil ersetzen, weitere Teile ergänzen
+            if event.get("replace", True):
+                self.surveys = {}
+            for survey_id, sessions in event["presence"].items():
+                merged = {**self.surveys.get(survey_id, {}), **sessions}
+                self.surveys[survey_id] = OrderedDict(sorted(merged.items(), key=lambda item: item[1]))
+    
+    def _expire(self, survey_id: str):
+        """Abgelaufene Einträge (verpasste Disconnects) vom Anfang entfernen"""
+        sessions = self.surveys.get(survey_id)
+        now = time.time()
+        while sessions and next(iter(sessions.values())) <= now:
+            session_id, _ = sessions.popitem(last=False)
+            print(f"Participant {session_id} expired in survey {survey_id}")
+        if sessions is not None and not sessions:
+            del self.surveys[survey_id]
+
+class SQLitePresenceStore:
+    """
+    Präsenz in der Tabelle participant_presence, gemeinsam für alle Worker und über Neustarts hinweg.
+    Abgelaufene Einträge zählen nicht mehr und werden beim nächsten Beitritt weggeräumt.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+    
+    async def _upsert(self, entries: List[tuple], ttl: Optional[float] = None) -> float:
+        stmt = sqlite_insert(PresenceDB)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["survey_id", "session_id"],
+            set_={"expires_at": stmt.excluded.expires_at}
+        )
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, [
+                {"survey_id": survey_id, "session_id": session_id, "expires_at": expires_at}
+                for survey_id, session_id in entries
+            ])
+            await db.commit()
+        return expires_at
+    
+    async def join(self, survey_id: str, session_id: str):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(PresenceDB).where(PresenceDB.survey_id == survey_id, PresenceDB.expires_at <= time.time()))
+            await db.commit()
+        await self._upsert([(survey_id, session_id)])
+        print(f"Participant {session_id} joined survey {survey_id}")
+    
+    async def refresh(self, entries: List[tuple]):
+        await self._upsert(entries)
+    
+    async def linger(self, survey_id: str, session_id: str, seconds: float) -> float:
+        return await self._upsert([(survey_id, session_id)], ttl=seconds)
+    
+    async def contains(self, survey_id: str, session_id: str) -> bool:
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(exists().where(
+                PresenceDB.survey_id == survey_id,
+                PresenceDB.session_id == session_id,
+                PresenceDB.expires_at > time.time()
+            )))
+    
+    async def leave(self, survey_id: str, session_id: str, lingering_until: Optional[float] = None) -> bool:
+        stmt = delete(PresenceDB).where(PresenceDB.survey_id == survey_id, PresenceDB.session_id == session_id)
+        if lingering_until is not None:
+            # Neu verbunden (in irgendeinem Worker) hat die Ablaufzeit verlängert: Eintrag bleibt
+            stmt = stmt.where(PresenceDB.expires_at <= lingering_until)
+        async with AsyncSessionLocal() as db:
+            removed = (await db.execute(stmt)).rowcount > 0
+            await db.commit()
+        if removed:
+            print(f"Participant {session_id} left survey {survey_id}")
+        return removed
+    
+    async def clear(self, survey_id: str):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(PresenceDB).where(PresenceDB.survey_id == survey_id))
+            await db.commit()
+        print(f"Cleared all waiting participants for survey {survey_id}")
+    
+    async def count(self, survey_id: str) -> int:
+        # Bereichszählung über den Index (survey_id, expires_at)
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(
+                select(func.count()).select_from(PresenceDB)
+                .where(PresenceDB.survey_id == survey_id, PresenceDB.expires_at > time.time())
+            )
+    
+    def apply(self, event: dict):
+        # Präsenz liegt in der Datenbank, Broker-Ereignisse betreffen diesen Store nicht
+        pass
+
+def create_presence_store():
+    """Präsenz-Store gemäß PRESENCE_BACKEND erzeugen"""
+    if PRESENCE_BACKEND == "sqlite":
+        return SQLitePresenceStore(PRESENCE_TTL_SECONDS)
+    return MemoryPresenceStore(PRESENCE_TTL_SECONDS)
+
+presence_store = create_presence_store()
 
-def track_participant_join(survey_id: str, session_id: str):
+async def track_participant_join(survey_id: str, session_id: str):
     """Teilnehmer als 'wartend' markieren"""
-    if survey_id not in participant_tracker:
-        participant_tracker[survey_id] = set()
-    participant_tracker[survey_id].add(session_id)
-    print(f"Participant {session_id} joined survey {survey_id}. Total waiting: {len(participant_tracker[survey_id])}")
-
-def track_participant_leave(survey_id: str, session_id: str):
-    """Teilnehmer entfernen"""
-    if survey_id in participant_tracker and session_id in participant_tracker[survey_id]:
-        participant_tracker[survey_id].remove(session_id)
-        if not participant_tracker[survey_id]:
-            del participant_tracker[survey_id]
-        print(f"Participant {session_id} left survey {survey_id}")
-
-def get_waiting_participants_count(survey_id: str) -> int:
+    await presence_store.join(survey_id, session_id)
+
+async def refresh_participant_presence(entries: List[tuple]):
+    """Präsenz mehrerer Teilnehmer (survey_id, session_id) gebündelt verlängern"""
+    if entries:
+        await presence_store.refresh(entries)
+
+def presence_entries(event: dict) -> List[tuple]:
+    """(survey_id, session_id) Paare eines join- oder gebündelten refresh-Ereignisses"""
+    if event["op"] == "refresh":
+        return [tuple(entry) for entry in event["entries"]]
+    return [(event["survey_id"], event["session_id"])]
+
+async def track_participant_leave(survey_id: str, session_id: str, lingering_until: Optional[float] = None) -> bool:
+    """Teilnehmer entfernen, True wenn ein Eintrag entfernt wurde"""
+    return await presence_store.leave(survey_id, session_id, lingering_until)
+
+async def get_waiting_participants_count(survey_id: str) -> int:
     """Anzahl wartender Teilnehmer abrufen"""
-    return len(participant_tracker.get(survey_id, set()))
+    return await presence_store.count(survey_id)
 
-def clear_waiting_participants(survey_id: str):
+async def clear_waiting_participants(survey_id: str):
     """Alle wartenden Teilnehmer einer Umfrage entfernen"""
-    if survey_id in participant_tracker:
-        del participant_tracker[survey_id]
-        print(f"Cleared all waiting participants for survey {survey_id}")
+    await presence_store.clear(survey_id)
+
+def dispatch_broker_event(event: dict):
+    """Ereignis vom Broker in diesem Prozess anwenden (Präsenz-Replikat und lokale Zustellung)"""
+    op = event["op"]
+    
+    if op == "broadcast":
+        ws_manager.deliver_broadcast(event)
+    elif op == "room_event":
+        ws_manager.buffer_room_event(event["survey_id"], event["event_type"], event["fields"])
+    elif op == "analytics_delta":
+        ws_manager.deliver_analytics_delta(event["survey_id"], event["message"])
+    elif op in ("join", "refresh", "leave", "clear", "presence_snapshot"):
+        presence_store.apply(event)
+    
+    # Survey-Cache: Änderungen aus allen Workern, Antwortzähler aus den Analytics-Deltas
+    if op == "analytics_delta":
+        survey_cache.update_response_count(event["survey_id"], event["message"]["response_count"])
+    elif op == "survey_changed":
+        survey_cache.bump(event["survey_id"])
+    elif op == "connected":
+        survey_cache.clear()
+
+# Pub/Sub-Broker für Broadcasts und Teilnehmer-Tracking
+# local: alles im selben Prozess (Standard, ein uvicorn-Worker)
+# unix: Worker-Prozesse tauschen Ereignisse über einen Unix-Socket aus (uvicorn --workers N)
+WS_BROKER = os.getenv("WS_BROKER", "local")
+WS_BROKER_SOCKET = os.getenv("WS_BROKER_SOCKET", "/tmp/survey_tool_broker.sock")
+WS_BROKER_MAX_BUFFER = int(os.getenv("WS_BROKER_MAX_BUFFER", str(16 * 1024 * 1024)))  # Bytes pro Hub-Client
+# Maximale Länge einer Ereignis-Zeile (asyncio-Standard sind 64 KiB, zu wenig für große analytics_delta)
+WS_BROKER_LINE_LIMIT = int(os.getenv("WS_BROKER_LINE_LIMIT", str(16 * 1024 * 1024)))
+# Teilnehmer pro presence_snapshot-Zeile, große Räume werden auf mehrere Zeilen verteilt
+PRESENCE_SNAPSHOT_CHUNK = 500
+
+class BroadcastSequencer:
+    """Nummeriert Broadcasts pro Umfrage fortlaufend; die Epoche wechselt, wenn die Zählung neu beginnt"""
+    
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.counters: Dict[str, int] = {}
+    
+    def stamp(self, event: dict) -> dict:
+        if event["op"] == "broadcast":
+            survey_id = event["survey_id"]
+            self.counters[survey_id] = self.counters.get(survey_id, 0) + 1
+            event["seq"] = self.counters[survey_id]
+            event["epoch"] = self.epoch
+        return event
+
+class LocalBroker:
+    """Broker für einen einzelnen Prozess: Ereignisse werden direkt lokal angewendet"""
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.sequencer = BroadcastSequencer()
+    
+    @property
+    def subscribed(self) -> bool:
+        return True
+    
+    def ensure_started(self):
+        pass
+    
+    def publish(self, event: dict):
+        self.handler(self.sequencer.stamp(event))
+
+class UnixSocketBroker:
+    """
+    Broker für mehrere Worker-Prozesse auf einem Host.
+    Ein Worker (per Dateisperre gewählt) betreibt zusätzlich den Hub, alle Worker verbinden sich als Clients.
+    Der Hub verteilt jedes Ereignis in Eingangsreihenfolge an alle Clients, auch an den Absender,
+    und nummeriert dabei die Broadcasts (neue Epoche nach einem Hub-Wechsel).
+    Zeilenbasiertes JSON, eine Zeile pro Ereignis.
+    """
+    
+    def __init__(self, path: str, handler):
+        if fcntl is None:
+            raise RuntimeError("WS_BROKER=unix wird auf dieser Plattform nicht unterstützt")
+        self.path = path
+        self.handler = handler
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task: Optional[asyncio.Task] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.outbox: deque = deque(maxlen=10000)  # Ereignisse während keine Hub-Verbindung besteht
+        # Von diesem Prozess gemeldete Teilnehmer (-> expires_at), werden nach einem Hub-Wechsel neu angemeldet
+        self.local_presence: Dict[str, Dict[str, float]] = {}
+        # Hub-Zustand (nur im gewählten Worker)
+        self.lock_file = None
+        self.server = None
+        self.hub_clients: Dict[asyncio.StreamWriter, Set[tuple]] = {}
+        self.hub_presence: Dict[str, Dict[str, float]] = {}
+        self.sequencer: Optional[BroadcastSequencer] = None
+    
+    @property
+    def subscribed(self) -> bool:
+        """Verbunden mit dem Hub, d.h. dieser Worker bekommt alle Ereignisse mit"""
+        return self.writer is not None
+    
+    def ensure_started(self):
+        """Client-Task (neu) starten, z.B. beim ersten Publish oder nach einem Loop-Wechsel"""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.task is None or self.task.done():
+            self.loop = loop
+            self.writer = None
+            self.task = loop.create_task(self._run())
+    
+    def publish(self, event: dict):
+        self.ensure_started()
+        self._track_local_presence(event)
+        line = encode_message(event).encode() + b"\n"
+        if self.writer is None:
+            self.outbox.append(line)
+        else:
+            self.writer.write(line)
+    
+    def _track_local_presence(self, event: dict):
+        op = event["op"]
+        if op in ("join", "refresh"):
+            for survey_id, session_id in presence_entries(event):
+                self.local_presence.setdefault(survey_id, {})[session_id] = event["expires_at"]
+        elif op == "leave":
+            self.local_presence.get(event["survey_id"], {}).pop(event["session_id"], None)
+        elif op == "clear":
+            self.local_presence.pop(event["survey_id"], None)
+    
+    async def _run(self):
+        while True:
+            try:
+                if self._try_become_hub() and self.server is None:
+                    if os.path.exists(self.path):
+                        os.unlink(self.path)
+                    self.sequencer = BroadcastSequencer()
+                    self.server = await asyncio.start_unix_server(self._serve_client, path=self.path, limit=WS_BROKER_LINE_LIMIT)
+                    print(f"Broker hub listening on {self.path}")
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=WS_BROKER_LINE_LIMIT)
+            except OSError:
+                await asyncio.sleep(0.2)
+                continue
+            
+            # Eigene Teilnehmer beim (neuen) Hub anmelden, danach gepufferte Ereignisse senden
+            for survey_id, sessions in self.local_presence.items():
+                for session_id, expires_at in sessions.items():
+                    writer.write(encode_message({
+                        "op": "join", "survey_id": survey_id, "session_id": session_id, "expires_at": expires_at
+                    }).encode() + b"\n")
+            while self.outbox:
+                writer.write(self.outbox.popleft())
+            self.writer = writer
+            # Während der Trennung verpasste Ereignisse: lokale Caches verwerfen
+            self.handler({"op": "connected"})
+            
+            try:
+                while line := await reader.readline():
+                    try:
+                        self.handler(json.loads(line))
+                    except Exception as e:
+                        print(f"Error handling broker event: {e}")
+            except (OSError, ValueError, asyncio.LimitOverrunError) as e:
+                # Zeile über WS_BROKER_LINE_LIMIT: Verbindung aufgeben und neu verbinden statt den Task zu beenden
+                if not isinstance(e, OSError):
+                    print(f"Error reading from broker hub: {e}")
+            finally:
+                self.writer = None
+                writer.close()
+            
+            print("Broker hub connection lost, reconnecting...")
+            await asyncio.sleep(0.1)
+    
+    def _try_become_hub(self) -> bool:
+        """Hub-Wahl über eine exklusive Dateisperre (wird beim Prozessende automatisch frei)"""
+        if self.lock_file is not None:
+            return True
+        lock_file = open(self.path + ".lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+    
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Hub: Ereignisse eines Workers an alle Worker weiterreichen"""
+        announced: Set[tuple] = set()
+        self.hub_clients[writer] = announced
+        for line in self._presence_snapshot_lines():
+            writer.write(line)
+        
+        try:
+            while line := await reader.readline():
+                event = json.loads(line)
+                self._apply_hub_presence(event, announced)
+                if event["op"] == "broadcast":
+                    line = encode_message(self.sequencer.stamp(event)).encode() + b"\n"
+                self._fan_out(line)
+        except (OSError, ValueError, asyncio.LimitOverrunError) as e:
+            # Zu lange oder kaputte Zeile: nur diesen Worker trennen, er verbindet sich neu
+            if not isinstance(e, OSError):
+                print(f"Error reading from broker client: {e}")
+        finally:
+            del self.hub_clients[writer]
+            writer.close()
+            # Teilnehmer eines beendeten Workers abmelden
+            for survey_id, session_id in announced:
+                event = {"op": "leave", "survey_id": survey_id, "session_id": session_id}
+                self._apply_hub_presence(event, set())
+                self._fan_out(encode_message(event).encode() + b"\n")
+    
+    def _presence_snapshot_lines(self) -> List[bytes]:
+        """Aktuelle Präsenz für einen neuen Worker, höchstens PRESENCE_SNAPSHOT_CHUNK Teilnehmer pro Zeile"""
+        now = time.time()
+        entries = [
+            (survey_id, session_id, expires_at)
+            for survey_id, sessions in self.hub_presence.items()
+            for session_id, expires_at in sessions.items() if expires_at > now
+        ]
+        lines = []
+        # Auch ohne Teilnehmer eine Zeile, sie ersetzt das Replikat
+        for start in range(0, max(len(entries), 1), PRESENCE_SNAPSHOT_CHUNK):
+            presence: Dict[str, Dict[str, float]] = {}
+            for survey_id, session_id, expires_at in entries[start:start + PRESENCE_SNAPSHOT_CHUNK]:
+                presence.setdefault(survey_id, {})[session_id] = expires_at
+            lines.append(encode_message({"op": "presence_snapshot", "presence": presence, "replace": start == 0}).encode() + b"\n")
+        return lines
+    
+    def _apply_hub_presence(self, event: dict, announced: Set[tuple]):
+        op = event["op"]
+        if op in ("join", "refresh"):
+            for survey_id, session_id in presence_entries(event):
+                self.hub_presence.setdefault(survey_id, {})[session_id] = event["expires_at"]
+                announced.add((survey_id, session_id))
+        elif op == "leave":
+            sessions = self.hub_presence.get(event["survey_id"], {})
+            sessions.pop(event["session_id"], None)
+            if not sessions:
+                self.hub_presence.pop(event["survey_id"], None)
+            announced.discard((event["survey_id"], event["session_id"]))
+        elif op == "clear":
+            self.hub_presence.pop(event["survey_id"], None)
+            for entry in [entry for entry in announced if entry[0] == event["survey_id"]]:
+                announced.discard(entry)
+    
+    def _fan_out(self, line: bytes):
+        for client in list(self.hub_clients):
+            if client.is_closing():
+                continue
+            # Langsamer Worker: trennen, er verbindet sich neu und bekommt einen Präsenz-Snapshot
+            if client.transport.get_write_buffer_size() > WS_BROKER_MAX_BUFFER:
+                client.close()
+                continue
+            client.write(line)
+
+def create_broker():
+    """Broker gemäß WS_BROKER erzeugen"""
+    if WS_BROKER == "unix":
+        return UnixSocketBroker(WS_BROKER_SOCKET, dispatch_broker_event)
+    return LocalBroker(dispatch_broker_event)
+
+broker = create_broker()
 
 # SQLAlchemy Imports
-from sqlalchemy import create_engine, String, DateTime, Boolean, Integer, Text, JSON, text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker, Session
+from sqlalchemy import create_engine, String, DateTime, Boolean, Integer, Float, Text, JSON, Index, UniqueConstraint, text, exists, select, update, delete, func, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 # Datenbank Setup
 # Für Vercel: Datenbank in /tmp schreiben da aktuelles Verzeichnis read-only ist
 DATABASE_PATH = "/tmp/survey_tool.db" if os.getenv("VERCEL") else "./survey_tool.db"
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+# SQLite Storage-Profil, wird auf jede neue Pool-Verbindung angewendet
+# WAL: Leser blockieren nicht hinter Schreibern; synchronous=NORMAL ist in WAL absturzsicher
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),  # Bytes
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negativ = KiB, also 64 MiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Connection Pool Größen (gelten für den sync und den async Engine)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Setzt das Storage-Profil auf einer frisch geöffneten SQLite-Verbindung"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+event.listen(engine, "connect", apply_sqlite_pragmas)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async Engine für die Endpunkte (blockiert den Event Loop nicht)
+# Der synchrone Engine wird nur noch für Tabellen-Erstellung und Migrationen beim Start genutzt
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
 # SQLAlchemy Models (Datenbank-Tabellen)
 class SurveyDB(Base):
     __tablename__ = "surveys"
+    __table_args__ = (
+        # Dashboard: eigene Umfragen, neueste zuerst (Keyset-Pagination)
+        Index("ix_surveys_owner_created", "owner_session", "created_at", "id"),
+    )
     
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -186,6 +1237,8 @@ class SurveyDB(Base):
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     response_count: Mapped[int] = mapped_column(Integer, default=0)
     owner_session: Mapped[str] = mapped_column(String, nullable=True, index=True, default="")
+    analytics_version: Mapped[int] = mapped_column(Integer, default=0)  # Sequenznummer der Live-Analytics
+    definition_version: Mapped[int] = mapped_column(Integer, default=0)  # Änderungen an Umfrage/Fragen (ETag)
 
 class QuestionDB(Base):
     __tablename__ = "questions"
@@ -202,6 +1255,10 @@ class QuestionDB(Base):
 
 class ResponseDB(Base):
     __tablename__ = "responses"
+    __table_args__ = (
+        # Export: Responses einer Umfrage in Abgabe-Reihenfolge ohne Sortierschritt streamen
+        Index("ix_responses_survey_submitted", "survey_id", "submitted_at"),
+    )
     
     id: Mapped[str] = mapped_column(String, primary_key=True, index=True)
     survey_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
@@ -209,6 +1266,146 @@ class ResponseDB(Base):
     answers: Mapped[list] = mapped_column(JSON, nullable=False)  # Als JSON gespeichert
     submitted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
+class AnswerDB(Base):
+    """Eine Zeile pro beantworteter Frage (normalisiert, typisierte Wertspalten)"""
+    __tablename__ = "answers"
+    __table_args__ = (
+        Index("ix_answers_survey_question", "survey_id", "question_id"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    response_id: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    survey_id: Mapped[str] = mapped_column(String, nullable=False)
+    question_id: Mapped[str] = mapped_column(String, nullable=False)
+    value_text: Mapped[str] = mapped_column(Text, nullable=True)  # Text / Single Choice
+    value_int: Mapped[int] = mapped_column(Integer, nullable=True)  # Rating
+    value_bool: Mapped[bool] = mapped_column(Boolean, nullable=True)  # Ja/Nein
+    value_json: Mapped[Any] = mapped_column(JSON, nullable=True)  # Multiple Choice (Liste) und alles andere
+
+# Wertebereich von SQLite INTEGER (signed 64 bit)
+SQLITE_INT_MIN = -2**63
+SQLITE_INT_MAX = 2**63 - 1
+
+def answer_value_columns(answer: Any) -> Dict[str, Any]:
+    """Ordnet einen Antwortwert der passenden typisierten Spalte zu"""
+    if isinstance(answer, bool):
+        return {"value_bool": answer}
+    if isinstance(answer, int) and SQLITE_INT_MIN <= answer <= SQLITE_INT_MAX:
+        return {"value_int": answer}
+    if isinstance(answer, str):
+        return {"value_text": answer}
+    return {"value_json": answer}
+
+def answer_value(value_text, value_int, value_bool, value_json) -> Any:
+    """Setzt den ursprünglichen Antwortwert aus den typisierten Spalten zusammen"""
+    if value_bool is not None:
+        return value_bool
+    if value_int is not None:
+        return value_int
+    if value_text is not None:
+        return value_text
+    return value_json
+
+def build_answer_rows(response_id: str, survey_id: str, answers: List[Dict[str, Any]]) -> List[AnswerDB]:
+    """Erzeugt die normalisierten Antwort-Zeilen für eine Response"""
+    return [
+        AnswerDB(
+            response_id=response_id,
+            survey_id=survey_id,
+            question_id=a["question_id"],
+            **answer_value_columns(a["answer"])
+        )
+        for a in answers
+    ]
+
+class AnswerAggregateDB(Base):
+    """
+    Inkrementell gepflegte Kennzahlen pro Frage.
+    kind = "answers" (Anzahl Antworten), "option" (Anzahl pro Auswahl) oder "rating" (Anzahl/Summe pro Bewertung)
+    """
+    __tablename__ = "answer_aggregates"
+    __table_args__ = (
+        UniqueConstraint("survey_id", "question_id", "kind", "key", name="uq_answer_aggregates_bucket"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)  # Reihenfolge des ersten Auftretens
+    survey_id: Mapped[str] = mapped_column(String, nullable=False)
+    question_id: Mapped[str] = mapped_column(String, nullable=False)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    key: Mapped[str] = mapped_column(String, nullable=False, default="")  # JSON-kodierter Antwortwert
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    value_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+class PresenceDB(Base):
+    """Wartende Teilnehmer für PRESENCE_BACKEND=sqlite, Einträge laufen ohne Heartbeat ab"""
+    __tablename__ = "participant_presence"
+    __table_args__ = (
+        Index("ix_participant_presence_survey_expires", "survey_id", "expires_at"),
+    )
+    
+    survey_id: Mapped[str] = mapped_column(String, primary_key=True)
+    session_id: Mapped[str] = mapped_column(String, primary_key=True)
+    expires_at: Mapped[float] = mapped_column(Float, nullable=False)  # Unix-Zeit
+
+# Bewertungsskala (Sterne) für Rating-Fragen
+RATING_SCALE = range(1, 6)
+
+def aggregate_buckets(question_type: str, answer: Any) -> List[tuple]:
+    """Liefert die (kind, key, value) Buckets, die eine einzelne Antwort erhöht"""
+    buckets = [("answers", "", 0)]
+    
+    if question_type in ["multiple_choice", "single_choice", "yes_no"]:
+        choices = answer if isinstance(answer, list) else [answer]
+        for choice in choices:
+            buckets.append(("option", json.dumps(choice), 0))
+    
+    elif question_type == "rating":
+        # Nur Bewertungen auf der Skala zählen, alles andere wird ignoriert
+        if isinstance(answer, (int, str)) and not isinstance(answer, bool) and str(answer).isdigit():
+            rating = int(answer)
+            if rating in RATING_SCALE:
+                buckets.append(("rating", json.dumps(rating), rating))
+    
+    return buckets
+
+def add_aggregate_deltas(deltas: Dict[tuple, List[int]], survey_id: str, question_id: str, question_type: str, answer: Any):
+    """Summiert die Buckets einer Antwort in deltas (survey_id, question_id, kind, key) -> [count, value_sum]"""
+    for kind, key, value in aggregate_buckets(question_type, answer):
+        delta = deltas.setdefault((survey_id, question_id, kind, key), [0, 0])
+        delta[0] += 1
+        delta[1] += value
+
+def aggregate_upsert(deltas: Dict[tuple, List[int]]):
+    """Statement und Parameter für das Hochzählen der Aggregate (INSERT ... ON CONFLICT DO UPDATE)"""
+    stmt = sqlite_insert(AnswerAggregateDB)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["survey_id", "question_id", "kind", "key"],
+        set_={
+            "count": AnswerAggregateDB.count + stmt.excluded.count,
+            "value_sum": AnswerAggregateDB.value_sum + stmt.excluded.value_sum
+        }
+    )
+    params = [
+        {"survey_id": survey_id, "question_id": question_id, "kind": kind, "key": key, "count": count, "value_sum": value_sum}
+        for (survey_id, question_id, kind, key), (count, value_sum) in deltas.items()
+    ]
+    return stmt, params
+
+def analytics_question_state(state: Dict[str, dict], question_id: str) -> dict:
+    """Live-Analytics-Eintrag einer Frage (Snapshot oder Delta) holen bzw. anlegen"""
+    return state.setdefault(question_id, {"answers": 0, "options": {}, "ratings": {}, "rating_sum": 0, "texts": []})
+
+def add_analytics_bucket(state: Dict[str, dict], question_id: str, kind: str, key: str, count: int, value_sum: int):
+    """Einen Aggregat-Bucket in den Live-Analytics-Zustand einrechnen (Keys bleiben JSON-kodiert)"""
+    question = analytics_question_state(state, question_id)
+    if kind == "answers":
+        question["answers"] += count
+    elif kind == "option":
+        question["options"][key] = question["options"].get(key, 0) + count
+    elif kind == "rating":
+        question["ratings"][key] = question["ratings"].get(key, 0) + count
+        question["rating_sum"] += value_sum
+
 # Datenbank-Tabellen erstellen
 print("Creating database tables...")
 Base.metadata.create_all(bind=engine)
@@ -240,9 +1437,147 @@ def ensure_owner_session_column():
     finally:
         db.close()
 
+def ensure_analytics_version_column():
+    """Fügt analytics_version Spalte hinzu falls sie nicht existiert"""
+    db = SessionLocal()
+    try:
+        columns = [row[1] for row in db.execute(text("PRAGMA table_info(surveys)")).fetchall()]
+        if 'analytics_version' not in columns:
+            print("Füge analytics_version Spalte zur surveys Tabelle hinzu...")
+            db.execute(text("ALTER TABLE surveys ADD COLUMN analytics_version INTEGER DEFAULT 0"))
+            db.commit()
+            
+    except Exception as e:
+        print(f"Migration Fehler: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def ensure_survey_listing_index():
+    """Legt den Index für die Dashboard-Liste an (bestehende Datenbanken bekommen ihn nicht über create_all)"""
+    db = SessionLocal()
+    try:
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_surveys_owner_created ON surveys (owner_session, created_at, id)"))
+        db.commit()
+    except Exception as e:
+        print(f"Migration Fehler: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def ensure_response_export_index():
+    """Legt den Index für den Rohdaten-Export an (bestehende Datenbanken bekommen ihn nicht über create_all)"""
+    db = SessionLocal()
+    try:
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_responses_survey_submitted ON responses (survey_id, submitted_at)"))
+        db.commit()
+    except Exception as e:
+        print(f"Migration Fehler: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def ensure_definition_version_column():
+    """Fügt definition_version Spalte hinzu falls sie nicht existiert"""
+    db = SessionLocal()
+    try:
+        columns = [row[1] for row in db.execute(text("PRAGMA table_info(surveys)")).fetchall()]
+        if 'definition_version' not in columns:
+            print("Füge definition_version Spalte zur surveys Tabelle hinzu...")
+            db.execute(text("ALTER TABLE surveys ADD COLUMN definition_version INTEGER DEFAULT 0"))
+            db.commit()
+            
+    except Exception as e:
+        print(f"Migration Fehler: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+# Backfill der answers Tabelle aus dem JSON in responses.answers
+def backfill_answers_table() -> set:
+    """Überträgt Antworten bestehender Responses in die normalisierte answers Tabelle"""
+    db = SessionLocal()
+    survey_ids = set()
+    try:
+        missing = db.query(ResponseDB).filter(
+            ~exists().where(AnswerDB.response_id == ResponseDB.id)
+        ).yield_per(500)
+        
+        backfilled = 0
+        for response_db in missing:
+            db.add_all(build_answer_rows(response_db.id, response_db.survey_id, response_db.answers or []))
+            survey_ids.add(response_db.survey_id)
+            backfilled += 1
+        
+        if backfilled:
+            db.commit()
+            print(f"answers Tabelle: {backfilled} Responses nachgetragen.")
+            
+    except Exception as e:
+        print(f"Backfill Fehler: {e}")
+        db.rollback()
+        survey_ids = set()
+    finally:
+        db.close()
+    return survey_ids
+
+# Aggregate aus der answers Tabelle neu aufbauen
+def rebuild_answer_aggregates(survey_ids: Optional[set] = None):
+    """Baut answer_aggregates für die angegebenen (oder alle) Umfragen aus den gespeicherten Antworten neu auf"""
+    db = SessionLocal()
+    try:
+        questions_query = select(QuestionDB.id, QuestionDB.type)
+        answers_query = select(
+            AnswerDB.survey_id, AnswerDB.question_id,
+            AnswerDB.value_text, AnswerDB.value_int, AnswerDB.value_bool, AnswerDB.value_json
+        ).order_by(AnswerDB.id)
+        delete_query = delete(AnswerAggregateDB)
+        if survey_ids is not None:
+            questions_query = questions_query.where(QuestionDB.survey_id.in_(survey_ids))
+            answers_query = answers_query.where(AnswerDB.survey_id.in_(survey_ids))
+            delete_query = delete_query.where(AnswerAggregateDB.survey_id.in_(survey_ids))
+        
+        question_types = dict(db.execute(questions_query).all())
+        deltas: Dict[tuple, List[int]] = {}
+        for row in db.execute(answers_query.execution_options(yield_per=1000)):
+            question_type = question_types.get(row.question_id)
+            if question_type is None:
+                continue  # Frage wurde gelöscht
+            answer = answer_value(row.value_text, row.value_int, row.value_bool, row.value_json)
+            add_aggregate_deltas(deltas, row.survey_id, row.question_id, question_type, answer)
+        
+        db.execute(delete_query)
+        if deltas:
+            stmt, params = aggregate_upsert(deltas)
+            db.execute(stmt, params)
+        db.commit()
+        print(f"answer_aggregates neu aufgebaut: {len(deltas)} Einträge.")
+        
+    except Exception as e:
+        print(f"Aggregat Fehler: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def answer_aggregates_missing() -> bool:
+    """True wenn Antworten existieren, aber noch keine Aggregate (z.B. nach einem Update)"""
+    with SessionLocal() as db:
+        has_answers = db.execute(select(AnswerDB.id).limit(1)).first() is not None
+        has_aggregates = db.execute(select(AnswerAggregateDB.id).limit(1)).first() is not None
+        return has_answers and not has_aggregates
+
 # Migration beim Start ausführen
 print("Running database migration...")
 ensure_owner_session_column()
+ensure_analytics_version_column()
+ensure_definition_version_column()
+ensure_survey_listing_index()
+ensure_response_export_index()
+backfilled_survey_ids = backfill_answers_table()
+if answer_aggregates_missing():
+    rebuild_answer_aggregates()
+elif backfilled_survey_ids:
+    rebuild_answer_aggregates(backfilled_survey_ids)
 print("Database migration completed.")
 
 # Pydantic Models für API (Request/Response)
@@ -290,6 +1625,16 @@ class Survey(SurveyBase):
     class Config:
         from_attributes = True
 
+class SurveySummary(BaseModel):
+    """Kompakte Listenansicht fürs Dashboard (ohne Fragen)"""
+    id: str
+    title: str
+    status: SurveyStatus
+    created_at: datetime
+    expires_at: datetime
+    response_count: int = 0
+    question_count: int = 0
+
 class AnswerSubmission(BaseModel):
     question_id: str
     answer: Any  # Kann String, List[str], int, bool sein
@@ -310,12 +1655,9 @@ class Response(BaseModel):
         from_attributes = True
 
 # Dependency für Datenbankverbindung
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # FastAPI App initialisieren
 app = FastAPI(
@@ -332,6 +1674,7 @@ app.add_middleware(
     allow_credentials=False,  # Must be False with allow_origins=["*"]
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Global Exception Handler für bessere Fehlerbehandlung
@@ -365,9 +1708,9 @@ def get_session_id_from_header(request: Request) -> str:
         session_id = generate_session_id()
     return session_id
 
-def check_survey_ownership(db: Session, survey_id: str, session_id: str) -> bool:
+async def check_survey_ownership(db: AsyncSession, survey_id: str, session_id: str) -> bool:
     """Prüft ob eine Umfrage dem aktuellen Session gehört"""
-    survey = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey = await db.get(SurveyDB, survey_id)
     if not survey:
         return False
     # Falls owner_session leer/None ist, gehört Umfrage niemandem (legacy)
@@ -375,14 +1718,14 @@ def check_survey_ownership(db: Session, survey_id: str, session_id: str) -> bool
         return True
     return survey.owner_session == session_id
 
-def generate_survey_id(db: Session) -> str:
+async def generate_survey_id(db: AsyncSession) -> str:
     """Generiert eine eindeutige 4-stellige Umfrage-ID"""
     while True:
         # Generiere eine 4-stellige Zahl
         survey_id = str(random.randint(1000, 9999))
         
         # Prüfe ob die ID bereits existiert
-        existing = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+        existing = await db.get(SurveyDB, survey_id)
         if not existing:
             return survey_id
 
@@ -390,31 +1733,61 @@ def generate_id() -> str:
     """Generiert eine UUID für andere Entitäten (Questions, Responses)"""
     return str(uuid.uuid4())
 
-def cleanup_expired_surveys(db: Session):
+async def cleanup_expired_surveys(db: AsyncSession):
     """Löscht abgelaufene Umfragen automatisch"""
     now = datetime.now()
-    expired_surveys = db.query(SurveyDB).filter(SurveyDB.expires_at <= now).all()
+    expired_surveys = (await db.scalars(select(SurveyDB).where(SurveyDB.expires_at <= now))).all()
     
     for survey in expired_surveys:
         # Lösche zuerst alle Fragen der Umfrage
-        db.query(QuestionDB).filter(QuestionDB.survey_id == survey.id).delete()
+        await db.execute(delete(QuestionDB).where(QuestionDB.survey_id == survey.id))
         # Lösche alle Antworten der Umfrage
-        db.query(ResponseDB).filter(ResponseDB.survey_id == survey.id).delete()
+        await db.execute(delete(AnswerDB).where(AnswerDB.survey_id == survey.id))
+        await db.execute(delete(AnswerAggregateDB).where(AnswerAggregateDB.survey_id == survey.id))
+        await db.execute(delete(ResponseDB).where(ResponseDB.survey_id == survey.id))
         # Lösche die Umfrage selbst
-        db.delete(survey)
+        await db.delete(survey)
     
     if expired_surveys:
-        db.commit()
+        expired_ids = [survey.id for survey in expired_surveys]
+        await db.commit()
+        for survey_id in expired_ids:
+            invalidate_survey(survey_id)
         print(f"Gelöscht: {len(expired_surveys)} abgelaufene Umfragen")
 
-def get_survey_with_questions(db: Session, survey_id: str) -> Survey:
+async def get_survey_with_questions(db: AsyncSession, survey_id: str) -> Survey:
     """Umfrage mit allen Fragen aus der Datenbank laden"""
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
-    questions_db = db.query(QuestionDB).filter(QuestionDB.survey_id == survey_id).order_by(QuestionDB.order).all()
+    questions_db = (await db.scalars(
+        select(QuestionDB).where(QuestionDB.survey_id == survey_id).order_by(QuestionDB.order)
+    )).all()
+    
+    return survey_from_db(survey_db, questions_db)
+
+# Obergrenze für Parameter in einer IN-Liste (ältere SQLite-Versionen erlauben nur 999)
+SQLITE_IN_CHUNK_SIZE = 500
+
+async def get_surveys_with_questions(db: AsyncSession, surveys_db: List[SurveyDB]) -> List[Survey]:
+    """Mehrere Umfragen mit ihren Fragen laden: eine IN-Abfrage für alle Fragen statt einer pro Umfrage"""
+    survey_ids = [survey_db.id for survey_db in surveys_db]
+    questions_by_survey: Dict[str, List[QuestionDB]] = {survey_id: [] for survey_id in survey_ids}
+    
+    for start in range(0, len(survey_ids), SQLITE_IN_CHUNK_SIZE):
+        questions_db = await db.scalars(
+            select(QuestionDB)
+            .where(QuestionDB.survey_id.in_(survey_ids[start:start + SQLITE_IN_CHUNK_SIZE]))
+            .order_by(QuestionDB.survey_id, QuestionDB.order)
+        )
+        for q_db in questions_db:
+            questions_by_survey[q_db.survey_id].append(q_db)
     
+    return [survey_from_db(survey_db, questions_by_survey[survey_db.id]) for survey_db in surveys_db]
+
+def survey_from_db(survey_db: SurveyDB, questions_db: List[QuestionDB]) -> Survey:
+    """API-Modell aus Datenbankzeilen bauen"""
     questions = []
     for q_db in questions_db:
         question = Question(
@@ -441,9 +1814,213 @@ def get_survey_with_questions(db: Session, survey_id: str) -> Survey:
         questions=questions
     )
 
+# Starke ETags aus Versionszählern, ohne den Inhalt zu laden oder zu serialisieren.
+# created_at unterscheidet eine gelöschte Umfrage von einer neuen mit derselben ID.
+def survey_etag(survey_id: str, created_at: datetime, **versions: int) -> str:
+    parts = "-".join(f"{name[0]}{value}" for name, value in versions.items())
+    return f'"{survey_id}-{int(created_at.timestamp() * 1_000_000)}-{parts}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match gegen den aktuellen ETag prüfen (mehrere Tags, * und W/-Präfix erlaubt)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+def not_modified(etag: str) -> HTTPResponse:
+    return HTTPResponse(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+# Größe des LRU-Caches für Umfrage-Definitionen (Anzahl Umfragen, 0 = aus)
+SURVEY_CACHE_SIZE = int(os.getenv("SURVEY_CACHE_SIZE", "512"))
+
+class SurveyDefinitionCache:
+    """
+    LRU-Cache der Umfrage-Definitionen (Umfrage + Fragen) für die lesenden Endpunkte, als Dict und
+    fertig kodiertes JSON. Jede Änderung erhöht die Version der Umfrage und verwirft den Eintrag;
+    ein Ladevorgang, der vor der Änderung begonnen hat, wird anhand der Version nicht übernommen.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries: OrderedDict = OrderedDict()  # survey_id -> {"data": dict, "payload": Optional[bytes], "revision": tuple}
+        self.versions: Dict[str, int] = {}
+        self.generation = 0  # clear() macht alle laufenden Ladevorgänge ungültig
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+    
+    def version(self, survey_id: str) -> tuple:
+        return (self.generation, self.versions.get(survey_id, 0))
+    
+    def get(self, survey_id: str) -> Optional[dict]:
+        entry = self.entries.get(survey_id)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(survey_id)
+        self.stats["hits"] += 1
+        return entry
+    
+    def put(self, survey_id: str, version: tuple, data: dict, revision: tuple) -> dict:
+        """Geladene Definition ablegen, außer sie wurde seit Beginn des Ladens geändert"""
+        entry = {"data": data, "payload": None, "revision": revision}  # revision: (created_at, definition_version)
+        if self.maxsize <= 0 or version != self.version(survey_id) or not broker.subscribed:
+            return entry
+        self.entries[survey_id] = entry
+        self.entries.move_to_end(survey_id)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        return entry
+    
+    @staticmethod
+    def payload(entry: dict) -> bytes:
+        """JSON der Definition, einmal kodiert und bis zur nächsten Änderung wiederverwendet"""
+        if entry["payload"] is None:
+            entry["payload"] = encode_message(entry["data"]).encode()
+        return entry["payload"]
+    
+    @staticmethod
+    def etag(survey_id: str, entry: dict) -> str:
+        created_at, definition_version = entry["revision"]
+        return survey_etag(survey_id, created_at, definition=definition_version, responses=entry["data"]["response_count"])
+    
+    def bump(self, survey_id: str):
+        self.versions[survey_id] = self.versions.get(survey_id, 0) + 1
+        if self.entries.pop(survey_id, None) is not None:
+            self.stats["invalidations"] += 1
+    
+    def update_response_count(self, survey_id: str, response_count: int):
+        """Antwortzähler nachziehen statt die Definition bei jeder Antwort zu verwerfen"""
+        entry = self.entries.get(survey_id)
+        if entry is not None and entry["data"]["response_count"] != response_count:
+            entry["data"]["response_count"] = response_count
+            entry["payload"] = None
+    
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+    
+    def metrics(self) -> dict:
+        return {"size": len(self.entries), "max_size": self.maxsize, **self.stats}
+
+survey_cache = SurveyDefinitionCache(SURVEY_CACHE_SIZE)
+
+def invalidate_survey(survey_id: str):
+    """Nach einer Änderung: lokal sofort (read-your-writes) und über den Broker in allen Workern verwerfen"""
+    survey_cache.bump(survey_id)
+    broker.publish({"op": "survey_changed", "survey_id": survey_id})
+
+class SingleFlight:
+    """
+    Gleichzeitige identische Ladevorgänge teilen sich einen Lauf (z.B. hunderte Teilnehmer, die
+    denselben Join-Code öffnen). Der Lauf ist ein eigener Task mit eigener DB-Session, damit ein
+    abgebrochener erster Request die übrigen Wartenden nicht mitreißt.
+    """
+    
+    def __init__(self):
+        self.calls: Dict[tuple, asyncio.Task] = {}
+        self.stats = {"loads": 0, "shared": 0}
+    
+    async def do(self, key: tuple, load):
+        task = self.calls.get(key)
+        if task is None:
+            self.stats["loads"] += 1
+            task = asyncio.create_task(load())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats["shared"] += 1
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: tuple, task: asyncio.Task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            task.exception()  # als abgeholt markieren, auch wenn kein Request mehr wartet
+    
+    def metrics(self) -> dict:
+        return {"in_flight": len(self.calls), **self.stats}
+
+single_flight = SingleFlight()
+
+async def load_survey_definition(db: AsyncSession, survey_id: str) -> dict:
+    """Umfrage-Definition aus dem Cache oder der Datenbank (Cache-Eintrag mit data und payload)"""
+    broker.ensure_started()
+    entry = survey_cache.get(survey_id)
+    if entry is None:
+        # Version im Schlüssel: wer nach einer Änderung kommt, hängt sich nicht an einen alten Lauf
+        version = survey_cache.version(survey_id)
+        entry = await single_flight.do(("survey", survey_id, version), lambda: fetch_survey_definition(survey_id, version))
+    return entry
+
+async def fetch_survey_definition(survey_id: str, version: tuple) -> dict:
+    async with AsyncSessionLocal() as db:
+        # Zuerst laden und festhalten: get_survey_with_questions bekommt dasselbe Objekt aus der
+        # (schwach referenzierten) Identity Map, die Revision ist also nie neuer als der Inhalt
+        survey_db = await db.get(SurveyDB, survey_id)
+        if not survey_db:
+            raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+        revision = (survey_db.created_at, survey_db.definition_version)
+        survey = await get_survey_with_questions(db, survey_id)
+    entry = survey_cache.put(survey_id, version, survey.model_dump(mode="json"), revision)
+    SurveyDefinitionCache.payload(entry)  # einmal kodieren, für alle Wartenden
+    return entry
+
+def survey_definition_response(request: Request, survey_id: str, entry: dict, selected_fields: Optional[Set[str]]) -> HTTPResponse:
+    """Definition aus dem Cache ausliefern: komplett als fertiges JSON (mit ETag, ggf. 304) oder als Sparse Fieldset"""
+    if selected_fields is not None:
+        return sparse_response({key: value for key, value in entry["data"].items() if key in selected_fields})
+    
+    etag = SurveyDefinitionCache.etag(survey_id, entry)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return HTTPResponse(
+        content=SurveyDefinitionCache.payload(entry),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
+async def get_question_answers(db: AsyncSession, survey_id: str, question_id: str) -> List[Any]:
+    """Alle Antwortwerte einer Frage aus der normalisierten answers Tabelle laden"""
+    rows = (await db.execute(
+        select(AnswerDB.value_text, AnswerDB.value_int, AnswerDB.value_bool, AnswerDB.value_json).where(
+            AnswerDB.survey_id == survey_id,
+            AnswerDB.question_id == question_id
+        ).order_by(AnswerDB.id)
+    )).all()
+    return [answer_value(*row) for row in rows]
+
+async def bump_analytics_version(db: AsyncSession, survey_id: str):
+    """Analytics-Version erhöhen, Live-Abonnenten sehen die Lücke und laden einen neuen Snapshot"""
+    await db.execute(
+        update(SurveyDB).where(SurveyDB.id == survey_id).values(analytics_version=SurveyDB.analytics_version + 1)
+    )
+
+async def bump_definition_version(db: AsyncSession, survey_id: str):
+    """Definitions-Version in derselben Transaktion wie die Änderung erhöhen (Grundlage der ETags)"""
+    await db.execute(
+        update(SurveyDB).where(SurveyDB.id == survey_id).values(definition_version=SurveyDB.definition_version + 1)
+    )
+
+async def rebuild_question_aggregates(db: AsyncSession, survey_id: str, question_id: str, question_type: str):
+    """Aggregate einer einzelnen Frage neu berechnen (z.B. nach Änderung des Fragetyps)"""
+    await db.execute(delete(AnswerAggregateDB).where(
+        AnswerAggregateDB.survey_id == survey_id,
+        AnswerAggregateDB.question_id == question_id
+    ))
+    
+    deltas: Dict[tuple, List[int]] = {}
+    for answer in await get_question_answers(db, survey_id, question_id):
+        add_aggregate_deltas(deltas, survey_id, question_id, question_type, answer)
+    
+    if deltas:
+        stmt, params = aggregate_upsert(deltas)
+        await db.execute(stmt, params)
+
 # Survey Endpoints
 @app.post("/surveys/", response_model=Survey, tags=["Surveys"])
-async def create_survey(survey_data: SurveyCreate, request: Request, db: Session = Depends(get_db)):
+async def create_survey(survey_data: SurveyCreate, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Erstellt eine neue Umfrage mit Fragen in der SQLite-Datenbank.
     
@@ -457,9 +2034,9 @@ async def create_survey(survey_data: SurveyCreate, request: Request, db: Session
     session_id = get_session_id_from_header(request)
     
     # Bereinige abgelaufene Umfragen vor der Erstellung einer neuen
-    cleanup_expired_surveys(db)
+    await cleanup_expired_surveys(db)
     
-    survey_id = generate_survey_id(db)
+    survey_id = await generate_survey_id(db)
     now = datetime.now()
     expires_at = now + timedelta(days=7)
     
@@ -506,7 +2083,7 @@ async def create_survey(survey_data: SurveyCreate, request: Request, db: Session
         )
         questions.append(question)
     
-    db.commit()
+    await db.commit()
     
     return Survey(
         id=survey_id,
@@ -520,122 +2097,239 @@ async def create_survey(survey_data: SurveyCreate, request: Request, db: Session
     )
 
 @app.get("/surveys/", response_model=List[Survey], tags=["Surveys"])
-async def get_all_surveys(request: Request, db: Session = Depends(get_db)):
-    """Alle Umfragen des aktuellen Sessions aus der Datenbank abrufen (bereinigt automatisch abgelaufene)"""
+async def get_all_surveys(
+    request: Request,
+    response: HTTPResponse,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Alle Umfragen des aktuellen Sessions aus der Datenbank abrufen (bereinigt automatisch abgelaufene).
+    
+    - **limit**: Seitengröße (optional, ohne limit kommen alle Umfragen)
+    - **after**: Cursor aus dem Header X-Next-Cursor der vorherigen Seite
+    - **fields**: nur diese Felder liefern, z.B. `id,title,status` (ohne `questions` werden keine Fragen geladen)
+    
+    Sortierung: neueste zuerst.
+    """
+    cursor = parse_survey_cursor(after) if after else None
+    selected_fields = parse_survey_fields(fields)
     try:
         # Session-ID extrahieren
         session_id = get_session_id_from_header(request)
         print(f"Getting surveys for session: {session_id}")
         
         # Bereinige abgelaufene Umfragen vor der Abfrage
-        cleanup_expired_surveys(db)
+        await cleanup_expired_surveys(db)
         
-        # Nur eigene Umfragen abrufen (Session-basiert)
-        surveys_db = db.query(SurveyDB).filter(SurveyDB.owner_session == session_id).all()
+        # Nur eigene Umfragen abrufen (Session-basiert), Keyset statt OFFSET
+        query = paginate_surveys(select(SurveyDB).where(SurveyDB.owner_session == session_id), cursor, limit)
+        surveys_db = (await db.scalars(query)).all()
         print(f"Found {len(surveys_db)} surveys for session {session_id}")
         
-        surveys = []
-        for survey_db in surveys_db:
-            survey = get_survey_with_questions(db, survey_db.id)
-            surveys.append(survey)
+        # Volle Seite: es kann weitere geben
+        if limit and len(surveys_db) == limit:
+            response.headers["X-Next-Cursor"] = survey_cursor(surveys_db[-1])
         
-        return surveys
+        if selected_fields is None:
+            return await get_surveys_with_questions(db, surveys_db)
+        
+        if "questions" in selected_fields:
+            surveys = await get_surveys_with_questions(db, surveys_db)
+        else:
+            surveys = [survey_from_db(survey_db, []) for survey_db in surveys_db]
+        return sparse_response([survey.model_dump(mode="json", include=selected_fields) for survey in surveys], response)
     
     except Exception as e:
         print(f"Error in get_all_surveys: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@app.get("/surveys/summary", response_model=List[SurveySummary], tags=["Surveys"])
+async def get_survey_summaries(
+    request: Request,
+    response: HTTPResponse,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Kompakte Liste der eigenen Umfragen fürs Dashboard: nur die angezeigten Spalten und die Anzahl der Fragen,
+    in einer einzigen Abfrage. Pagination wie bei GET /surveys/.
+    """
+    cursor = parse_survey_cursor(after) if after else None
+    session_id = get_session_id_from_header(request)
+    await cleanup_expired_surveys(db)
+    
+    question_count = (
+        select(func.count(QuestionDB.id))
+        .where(QuestionDB.survey_id == SurveyDB.id)
+        .correlate(SurveyDB)
+        .scalar_subquery()
+    )
+    query = paginate_surveys(select(
+        SurveyDB.id,
+        SurveyDB.title,
+        SurveyDB.status,
+        SurveyDB.created_at,
+        SurveyDB.expires_at,
+        SurveyDB.response_count,
+        question_count.label("question_count")
+    ).where(SurveyDB.owner_session == session_id), cursor, limit)
+    rows = (await db.execute(query)).all()
+    
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = survey_cursor(rows[-1])
+    
+    return [row._asdict() for row in rows]
+
+def paginate_surveys(query, cursor: Optional[tuple], limit: Optional[int]):
+    """Keyset-Pagination (neueste zuerst) auf eine Umfragen-Abfrage anwenden"""
+    if cursor:
+        created_at, survey_id = cursor
+        query = query.where(
+            (SurveyDB.created_at < created_at) |
+            ((SurveyDB.created_at == created_at) & (SurveyDB.id < survey_id))
+        )
+    query = query.order_by(SurveyDB.created_at.desc(), SurveyDB.id.desc())
+    if limit:
+        query = query.limit(limit)
+    return query
+
+def survey_cursor(last) -> str:
+    """Cursor für die nächste Seite aus der letzten Zeile (ORM-Objekt oder Core-Row)"""
+    return f"{last.created_at.isoformat()}_{last.id}"
+
+def parse_survey_cursor(after: str) -> tuple:
+    """Cursor "created_at_id" der Dashboard-Pagination zerlegen"""
+    created_at, _, survey_id = after.rpartition("_")
+    try:
+        return datetime.fromisoformat(created_at), survey_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor")
+
+def parse_survey_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    """Sparse Fieldset aus ?fields=a,b,c (None = alle Felder)"""
+    if not fields:
+        return None
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(Survey.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Felder: {', '.join(sorted(unknown))}")
+    return selected
+
+def sparse_response(content: Any, response: Optional[HTTPResponse] = None) -> JSONResponse:
+    """Teilantwort direkt als JSON senden (am response_model vorbei), gesetzte Header übernehmen"""
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return JSONResponse(content=content, headers=headers)
+
 @app.get("/surveys/{survey_id}", response_model=Survey, tags=["Surveys"])
-async def get_survey(survey_id: str, request: Request, db: Session = Depends(get_db)):
-    """Eine spezifische Umfrage aus der Datenbank abrufen (nur eigene Umfragen)"""
+async def get_survey(survey_id: str, request: Request, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Eine spezifische Umfrage aus der Datenbank abrufen (nur eigene Umfragen, optional nur `fields`)"""
+    selected_fields = parse_survey_fields(fields)
     # Session-ID extrahieren
     session_id = get_session_id_from_header(request)
     
     # Ownership prüfen
-    if not check_survey_ownership(db, survey_id, session_id):
+    if not await check_survey_ownership(db, survey_id, session_id):
         raise HTTPException(
             status_code=403, 
             detail="Access denied. You can only access your own surveys."
         )
     
-    return get_survey_with_questions(db, survey_id)
+    return survey_definition_response(request, survey_id, await load_survey_definition(db, survey_id), selected_fields)
 
 # Public Endpoints (für Teilnehmer)
 @app.get("/public/surveys/{survey_id}", response_model=Survey, tags=["Public"])
-async def get_public_survey(survey_id: str, db: Session = Depends(get_db)):
-    """Öffentlicher Zugriff auf eine Umfrage für Teilnehmer"""
+async def get_public_survey(survey_id: str, request: Request, fields: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    """Öffentlicher Zugriff auf eine Umfrage für Teilnehmer (optional nur `fields`, z.B. `status`)"""
+    selected_fields = parse_survey_fields(fields)
     try:
-        return get_survey_with_questions(db, survey_id)
+        entry = await load_survey_definition(db, survey_id)
     except HTTPException:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden oder nicht verfügbar")
+    
+    return survey_definition_response(request, survey_id, entry, selected_fields)
 
 @app.put("/surveys/{survey_id}", response_model=Survey, tags=["Surveys"])
-async def update_survey(survey_id: str, survey_data: SurveyBase, db: Session = Depends(get_db)):
+async def update_survey(survey_id: str, survey_data: SurveyBase, db: AsyncSession = Depends(get_db)):
     """Umfrage-Details in der Datenbank aktualisieren"""
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
     survey_db.title = survey_data.title
     survey_db.description = survey_data.description
     survey_db.status = survey_data.status.value
+    await bump_definition_version(db, survey_id)
     
-    db.commit()
-    return get_survey_with_questions(db, survey_id)
+    await db.commit()
+    invalidate_survey(survey_id)
+    return await get_survey_with_questions(db, survey_id)
 
 @app.put("/surveys/{survey_id}/status", response_model=Survey, tags=["Surveys"])
-async def update_survey_status(survey_id: str, status: SurveyStatus, request: Request, db: Session = Depends(get_db)):
+async def update_survey_status(survey_id: str, status: SurveyStatus, request: Request, db: AsyncSession = Depends(get_db)):
     """Status einer Umfrage ändern (nur eigene Umfragen)"""
     # Session-ID extrahieren und Ownership prüfen
     session_id = get_session_id_from_header(request)
-    if not check_survey_ownership(db, survey_id, session_id):
+    if not await check_survey_ownership(db, survey_id, session_id):
         raise HTTPException(
             status_code=403, 
             detail="Access denied. You can only modify your own surveys."
         )
     
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
     survey_db.status = status.value
+    await bump_definition_version(db, survey_id)
     
-    db.commit()
-    return get_survey_with_questions(db, survey_id)
+    await db.commit()
+    invalidate_survey(survey_id)
+    return await get_survey_with_questions(db, survey_id)
 
 @app.delete("/surveys/{survey_id}", tags=["Surveys"])
-async def delete_survey(survey_id: str, request: Request, db: Session = Depends(get_db)):
+async def delete_survey(survey_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Umfrage und alle zugehörigen Daten aus der Datenbank löschen (nur eigene Umfragen)"""
     # Session-ID extrahieren und Ownership prüfen
     session_id = get_session_id_from_header(request)
-    if not check_survey_ownership(db, survey_id, session_id):
+    if not await check_survey_ownership(db, survey_id, session_id):
         raise HTTPException(
             status_code=403, 
             detail="Access denied. You can only delete your own surveys."
         )
     
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
     # Zugehörige Fragen und Antworten löschen
-    db.query(QuestionDB).filter(QuestionDB.survey_id == survey_id).delete()
-    db.query(ResponseDB).filter(ResponseDB.survey_id == survey_id).delete()
-    db.query(SurveyDB).filter(SurveyDB.id == survey_id).delete()
-    
-    db.commit()
+    await db.execute(delete(QuestionDB).where(QuestionDB.survey_id == survey_id))
+    await db.execute(delete(AnswerDB).where(AnswerDB.survey_id == survey_id))
+    await db.execute(delete(AnswerAggregateDB).where(AnswerAggregateDB.survey_id == survey_id))
+    await db.execute(delete(ResponseDB).where(ResponseDB.survey_id == survey_id))
+    await db.execute(delete(SurveyDB).where(SurveyDB.id == survey_id))
+    
+    await db.commit()
+    invalidate_survey(survey_id)
     return {"message": "Umfrage erfolgreich gelöscht"}
 
 # Question Endpoints
 @app.post("/surveys/{survey_id}/questions/", response_model=Question, tags=["Questions"])
-async def add_question(survey_id: str, question_data: QuestionCreate, db: Session = Depends(get_db)):
+async def add_question(survey_id: str, question_data: QuestionCreate, db: AsyncSession = Depends(get_db)):
     """Neue Frage zu einer Umfrage in der Datenbank hinzufügen"""
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
     # Aktuelle Anzahl Fragen ermitteln für Order
-    question_count = db.query(QuestionDB).filter(QuestionDB.survey_id == survey_id).count()
+    question_count = await db.scalar(
+        select(func.count()).select_from(QuestionDB).where(QuestionDB.survey_id == survey_id)
+    )
     
     question_id = generate_id()
     question_db = QuestionDB(
@@ -651,7 +2345,9 @@ async def add_question(survey_id: str, question_data: QuestionCreate, db: Sessio
     )
     
     db.add(question_db)
-    db.commit()
+    await bump_definition_version(db, survey_id)
+    await db.commit()
+    invalidate_survey(survey_id)
     
     return Question(
         id=question_id,
@@ -666,23 +2362,32 @@ async def add_question(survey_id: str, question_data: QuestionCreate, db: Sessio
     )
 
 @app.put("/surveys/{survey_id}/questions/{question_id}", response_model=Question, tags=["Questions"])
-async def update_question(survey_id: str, question_id: str, question_data: QuestionBase, db: Session = Depends(get_db)):
+async def update_question(survey_id: str, question_id: str, question_data: QuestionBase, db: AsyncSession = Depends(get_db)):
     """Frage in der Datenbank aktualisieren"""
-    question_db = db.query(QuestionDB).filter(
+    question_db = await db.scalar(select(QuestionDB).where(
         QuestionDB.id == question_id,
         QuestionDB.survey_id == survey_id
-    ).first()
+    ))
     
     if not question_db:
         raise HTTPException(status_code=404, detail="Frage nicht gefunden")
     
+    type_changed = question_db.type != question_data.type.value
+    
     question_db.title = question_data.title
     question_db.type = question_data.type.value
     question_db.options = question_data.options
     question_db.required = question_data.required
     question_db.description = question_data.description
     
-    db.commit()
+    # Aggregate hängen vom Fragetyp ab
+    if type_changed:
+        await rebuild_question_aggregates(db, survey_id, question_id, question_db.type)
+        await bump_analytics_version(db, survey_id)
+    await bump_definition_version(db, survey_id)
+    
+    await db.commit()
+    invalidate_survey(survey_id)
     
     return Question(
         id=question_db.id,
@@ -697,24 +2402,201 @@ async def update_question(survey_id: str, question_id: str, question_data: Quest
     )
 
 @app.delete("/surveys/{survey_id}/questions/{question_id}", tags=["Questions"])
-async def delete_question(survey_id: str, question_id: str, db: Session = Depends(get_db)):
+async def delete_question(survey_id: str, question_id: str, db: AsyncSession = Depends(get_db)):
     """Frage aus der Datenbank löschen"""
-    question_db = db.query(QuestionDB).filter(
+    question_db = await db.scalar(select(QuestionDB).where(
         QuestionDB.id == question_id,
         QuestionDB.survey_id == survey_id
-    ).first()
+    ))
     
     if not question_db:
         raise HTTPException(status_code=404, detail="Frage nicht gefunden")
     
-    db.query(QuestionDB).filter(QuestionDB.id == question_id).delete()
-    db.commit()
+    await db.execute(delete(QuestionDB).where(QuestionDB.id == question_id))
+    await db.execute(delete(AnswerAggregateDB).where(
+        AnswerAggregateDB.survey_id == survey_id,
+        AnswerAggregateDB.question_id == question_id
+    ))
+    await bump_analytics_version(db, survey_id)
+    await bump_definition_version(db, survey_id)
+    await db.commit()
+    invalidate_survey(survey_id)
     
     return {"message": "Frage erfolgreich gelöscht"}
 
+# Group-Commit Queue für Response-Submissions
+RESPONSE_BATCH_MAX_ROWS = int(os.getenv("RESPONSE_BATCH_MAX_ROWS", "200"))
+RESPONSE_BATCH_MAX_DELAY_MS = float(os.getenv("RESPONSE_BATCH_MAX_DELAY_MS", "5"))
+
+class ResponseIngestQueue:
+    """
+    Sammelt eingehende Responses und schreibt sie gebündelt in einer Transaktion.
+    Ein Batch wird geschrieben sobald max_rows erreicht sind oder max_delay_ms abgelaufen ist.
+    """
+    
+    def __init__(self, max_rows: int, max_delay_ms: float):
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _ensure_worker(self):
+        """Worker-Task (neu) starten, z.B. beim ersten Submit oder nach einem Loop-Wechsel"""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.worker is None or self.worker.done():
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self._run())
+    
+    async def submit(self, response_db: "ResponseDB", answer_rows: List["AnswerDB"]) -> int:
+        """Response einreihen und warten bis der Batch committed ist. Liefert den neuen response_count."""
+        self._ensure_worker()
+        future = self.loop.create_future()
+        await self.queue.put((response_db, answer_rows, future))
+        return await future
+    
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = self.loop.time() + self.max_delay
+            
+            # Weitere Submissions sammeln bis Batch voll oder Wartezeit abgelaufen
+            while len(batch) < self.max_rows:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                print(f"Error flushing response batch: {e}")
+                await self._flush_individually(batch, e)
+    
+    async def _flush_individually(self, batch, error: Exception):
+        """
+        Nach einem fehlgeschlagenen Batch die noch offenen Submissions einzeln schreiben,
+        damit nur die fehlerhafte Submission ihren Fehler bekommt.
+        Bereits erledigte Futures (committed oder 404) werden übersprungen.
+        """
+        pending = [item for item in batch if not item[2].done()]
+        if len(pending) == 1:
+            pending[0][2].set_exception(error)
+            return
+        
+        for response_db, answer_rows, future in pending:
+            # Beim Rollback vergebene Autoincrement-IDs verwerfen
+            for row in answer_rows:
+                row.id = None
+            try:
+                await self._flush([(response_db, answer_rows, future)])
+            except Exception as e:
+                print(f"Error storing response {response_db.id}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def _flush(self, batch):
+        """Einen Batch in einer einzigen Transaktion schreiben und danach die Hosts informieren"""
+        accepted = []
+        batch_counts: Dict[str, int] = {}
+        aggregate_deltas: Dict[tuple, List[int]] = {}
+        text_answers: Dict[str, List[tuple]] = {}
+        
+        async with AsyncSessionLocal() as db:
+            surveys: Dict[str, bool] = {}
+            question_types: Dict[str, str] = {}
+            for response_db, answer_rows, future in batch:
+                survey_id = response_db.survey_id
+                if survey_id not in surveys:
+                    surveys[survey_id] = await db.scalar(select(SurveyDB.id).where(SurveyDB.id == survey_id)) is not None
+                    question_types.update((await db.execute(
+                        select(QuestionDB.id, QuestionDB.type).where(QuestionDB.survey_id == survey_id)
+                    )).all())
+                if not surveys[survey_id]:
+                    # Umfrage wurde zwischenzeitlich gelöscht (Future ist schon erledigt, wenn der Client abgebrochen hat)
+                    if not future.done():
+                        future.set_exception(HTTPException(status_code=404, detail="Umfrage nicht gefunden"))
+                    continue
+                
+                db.add(response_db)
+                db.add_all(answer_rows)
+                batch_counts[survey_id] = batch_counts.get(survey_id, 0) + 1
+                accepted.append((response_db, future))
+                
+                for row in answer_rows:
+                    if row.question_id in question_types:
+                        answer = answer_value(row.value_text, row.value_int, row.value_bool, row.value_json)
+                        add_aggregate_deltas(aggregate_deltas, survey_id, row.question_id, question_types[row.question_id], answer)
+                        if question_types[row.question_id] == "text" and row.value_text is not None:
+                            text_answers.setdefault(survey_id, []).append((row.question_id, row.value_text))
+            
+            # Aggregate in derselben Transaktion hochzählen
+            if aggregate_deltas:
+                stmt, params = aggregate_upsert(aggregate_deltas)
+                await db.execute(stmt, params)
+            
+            # Response Count und Analytics-Version atomar pro Umfrage und Batch hochzählen, neue Werte per RETURNING
+            response_counts = {}
+            analytics_versions = {}
+            for survey_id, count in batch_counts.items():
+                response_counts[survey_id], analytics_versions[survey_id] = (await db.execute(
+                    update(SurveyDB)
+                    .where(SurveyDB.id == survey_id)
+                    .values(
+                        response_count=SurveyDB.response_count + count,
+                        analytics_version=SurveyDB.analytics_version + 1
+                    )
+                    .returning(SurveyDB.response_count, SurveyDB.analytics_version)
+                )).one()
+            
+            await db.commit()
+        
+        for response_db, future in accepted:
+            if not future.done():
+                future.set_result(response_counts[response_db.survey_id])
+        
+        # Analytics-Delta pro Umfrage und Batch an abonnierte Hosts (auch in anderen Workern)
+        for survey_id, count in batch_counts.items():
+            questions: Dict[str, dict] = {}
+            for (delta_survey_id, question_id, kind, key), (delta_count, value_sum) in aggregate_deltas.items():
+                if delta_survey_id == survey_id:
+                    add_analytics_bucket(questions, question_id, kind, key, delta_count, value_sum)
+            for question_id, value_text in text_answers.get(survey_id, []):
+                analytics_question_state(questions, question_id)["texts"].append(value_text)
+            
+            ws_manager.publish_analytics_delta(survey_id, {
+                "type": "analytics_delta",
+                "survey_id": survey_id,
+                "seq": analytics_versions[survey_id],
+                "response_count": response_counts[survey_id],
+                "batch_size": count,
+                "questions": questions
+            })
+        
+        # Live-Update an Hosts senden (ein Event pro Umfrage und Batch)
+        for survey_id, count in batch_counts.items():
+            last_response = [r for r, _ in accepted if r.survey_id == survey_id][-1]
+            ws_manager.publish_room_event(
+                survey_id,
+                "response_submitted",
+                response_count=response_counts[survey_id],
+                batch_size=count,
+                participant_name=last_response.participant_name,
+                submitted_at=last_response.submitted_at.isoformat()
+            )
+
+response_ingest_queue = ResponseIngestQueue(RESPONSE_BATCH_MAX_ROWS, RESPONSE_BATCH_MAX_DELAY_MS)
+
 # Response Endpoints
 @app.post("/responses/", response_model=Response, tags=["Responses"])
-async def submit_response(response_data: ResponseSubmission, db: Session = Depends(get_db)):
+async def submit_response(response_data: ResponseSubmission, db: AsyncSession = Depends(get_db)):
     """
     Antwort auf eine Umfrage in der Datenbank speichern.
     
@@ -722,16 +2604,20 @@ async def submit_response(response_data: ResponseSubmission, db: Session = Depen
     - **answers**: Liste der Antworten mit question_id und answer
     - **participant_name**: Name des Teilnehmers (optional)
     """
-    # Umfrage existiert?
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == response_data.survey_id).first()
-    if not survey_db:
+    return await store_response(response_data, db)
+
+async def store_response(response_data: ResponseSubmission, db: AsyncSession) -> Response:
+    """Antwort validieren und über die Group-Commit Queue speichern (HTTP und WebSocket-submit)"""
+    # Umfrage existiert? (nur die ID laden, die Zeile wird hier nicht verändert)
+    survey_exists = await db.scalar(select(SurveyDB.id).where(SurveyDB.id == response_data.survey_id))
+    if not survey_exists:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
     # Pflichtfragen validieren
-    required_questions = db.query(QuestionDB).filter(
+    required_questions = (await db.scalars(select(QuestionDB).where(
         QuestionDB.survey_id == response_data.survey_id,
         QuestionDB.required == True
-    ).all()
+    ))).all()
     
     required_question_ids = {q.id for q in required_questions}
     answered_question_ids = {a.question_id for a in response_data.answers}
@@ -743,65 +2629,68 @@ async def submit_response(response_data: ResponseSubmission, db: Session = Depen
             detail=f"Erforderliche Fragen nicht beantwortet: {missing_questions}"
         )
     
-    # Antwort in Datenbank speichern
+    # Antwort in die Group-Commit Queue geben, wartet bis der Batch committed ist
     response_id = generate_id()
     answers_json = [{"question_id": a.question_id, "answer": a.answer} for a in response_data.answers]
+    submitted_at = datetime.now()
     
     response_db = ResponseDB(
         id=response_id,
         survey_id=response_data.survey_id,
         participant_name=response_data.participant_name,
         answers=answers_json,
-        submitted_at=datetime.now()
+        submitted_at=submitted_at
     )
     
-    db.add(response_db)
-    
-    # Response Count aktualisieren
-    survey_db.response_count += 1
-    
-    db.commit()
-    
-    # Live-Update an Hosts senden
-    await ws_manager.broadcast_to_hosts(response_data.survey_id, {
-        "type": "response_submitted",
-        "survey_id": response_data.survey_id,
-        "response_count": survey_db.response_count,
-        "participant_name": response_data.participant_name,
-        "submitted_at": datetime.now().isoformat()
-    })
+    # Verbindung vor dem Warten freigeben, damit der Batch-Writer nicht um den Pool konkurriert
+    await db.close()
+    await response_ingest_queue.submit(
+        response_db,
+        build_answer_rows(response_id, response_data.survey_id, answers_json)
+    )
     
     return Response(
         id=response_id,
         survey_id=response_data.survey_id,
         participant_name=response_data.participant_name,
         answers=response_data.answers,
-        submitted_at=datetime.now()
+        submitted_at=submitted_at
     )
 
 @app.get("/surveys/{survey_id}/responses/", response_model=List[Response], tags=["Responses"])
-async def get_survey_responses(survey_id: str, db: Session = Depends(get_db)):
-    """Alle Antworten zu einer Umfrage aus der Datenbank abrufen"""
-    responses_db = db.query(ResponseDB).filter(ResponseDB.survey_id == survey_id).all()
+async def get_survey_responses(survey_id: str, request: Request, response: HTTPResponse, db: AsyncSession = Depends(get_db)):
+    """Alle Antworten zu einer Umfrage aus der Datenbank abrufen (ETag aus response_count)"""
+    # Erst den Zähler lesen, dann die Antworten (gleiche Transaktion): der Inhalt ist nie älter als der ETag
+    revision = (await db.execute(
+        select(SurveyDB.created_at, SurveyDB.response_count).where(SurveyDB.id == survey_id)
+    )).one_or_none()
+    if revision is not None:
+        etag = survey_etag(survey_id, revision.created_at, responses=revision.response_count)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    
+    responses_db = (await db.scalars(select(ResponseDB).where(ResponseDB.survey_id == survey_id))).all()
     
     responses = []
     for r_db in responses_db:
         answers = [AnswerSubmission(question_id=a["question_id"], answer=a["answer"]) for a in r_db.answers]
-        response = Response(
+        item = Response(
             id=r_db.id,
             survey_id=r_db.survey_id,
             participant_name=r_db.participant_name,
             answers=answers,
             submitted_at=r_db.submitted_at
         )
-        responses.append(response)
+        responses.append(item)
     
     return responses
 
 @app.get("/responses/{response_id}", response_model=Response, tags=["Responses"])
-async def get_response(response_id: str, db: Session = Depends(get_db)):
+async def get_response(response_id: str, db: AsyncSession = Depends(get_db)):
     """Eine spezifische Antwort aus der Datenbank abrufen"""
-    response_db = db.query(ResponseDB).filter(ResponseDB.id == response_id).first()
+    response_db = await db.get(ResponseDB, response_id)
     if not response_db:
         raise HTTPException(status_code=404, detail="Antwort nicht gefunden")
     
@@ -816,267 +2705,545 @@ async def get_response(response_id: str, db: Session = Depends(get_db)):
     )
 
 # Analytics Endpoints
+async def load_analytics_state(db: AsyncSession, survey_id: str) -> Dict[str, dict]:
+    """Kompletter Live-Analytics-Zustand einer Umfrage (Aggregate + Freitextantworten)"""
+    state: Dict[str, dict] = {}
+    
+    aggregates_db = (await db.scalars(
+        select(AnswerAggregateDB).where(AnswerAggregateDB.survey_id == survey_id).order_by(AnswerAggregateDB.id)
+    )).all()
+    for aggregate in aggregates_db:
+        add_analytics_bucket(state, aggregate.question_id, aggregate.kind, aggregate.key, aggregate.count, aggregate.value_sum)
+    
+    text_rows = (await db.execute(
+        select(AnswerDB.question_id, AnswerDB.value_text)
+        .join(QuestionDB, QuestionDB.id == AnswerDB.question_id)
+        .where(AnswerDB.survey_id == survey_id, QuestionDB.type == "text", AnswerDB.value_text.is_not(None))
+        .order_by(AnswerDB.id)
+    )).all()
+    for question_id, value_text in text_rows:
+        analytics_question_state(state, question_id)["texts"].append(value_text)
+    
+    return state
+
 @app.get("/surveys/{survey_id}/analytics/", tags=["Analytics"])
-async def get_survey_analytics(survey_id: str, db: Session = Depends(get_db)):
+async def get_survey_analytics(survey_id: str, request: Request):
     """
     Grundlegende Analyse-Daten für eine Umfrage aus der Datenbank.
     Zeigt Antwortverteilung für Multiple-Choice-Fragen.
     """
-    survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+    # Nur die Versionszähler lesen: reicht für die Revalidierung und bestimmt den Single-Flight Key
+    async with AsyncSessionLocal() as db:
+        revision = (await db.execute(
+            select(SurveyDB.created_at, SurveyDB.definition_version, SurveyDB.analytics_version).where(SurveyDB.id == survey_id)
+        )).one_or_none()
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+    
+    etag = analytics_etag(survey_id, *revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Gleichzeitige Abrufe teilen sich eine Berechnung und dasselbe kodierte JSON.
+    # Die Version im Key verhindert, dass ein Abruf nach einer neuen Antwort an eine ältere Berechnung gehängt wird.
+    etag, payload = await single_flight.do(("analytics", survey_id, etag), lambda: fetch_survey_analytics(survey_id))
+    return HTTPResponse(content=payload, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def analytics_etag(survey_id: str, created_at: datetime, definition_version: int, analytics_version: int) -> str:
+    return survey_etag(survey_id, created_at, definition=definition_version, analytics=analytics_version)
+
+async def fetch_survey_analytics(survey_id: str) -> tuple:
+    async with AsyncSessionLocal() as db:
+        # Erst die Versionen, dann die Aggregate: der Inhalt ist nie älter als der ETag.
+        # survey_db bleibt referenziert, damit build_survey_analytics dasselbe Objekt bekommt.
+        survey_db = await db.get(SurveyDB, survey_id)
+        if not survey_db:
+            raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+        etag = analytics_etag(survey_id, survey_db.created_at, survey_db.definition_version, survey_db.analytics_version)
+        analytics = await build_survey_analytics(db, survey_id)
+    return etag, json.dumps(analytics, separators=(",", ":")).encode()
+
+async def build_survey_analytics(db: AsyncSession, survey_id: str) -> dict:
+    """Analyse-Daten aus den vorberechneten Aggregaten zusammenstellen"""
+    survey_db = await db.get(SurveyDB, survey_id)
     if not survey_db:
         raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
-    questions_db = db.query(QuestionDB).filter(QuestionDB.survey_id == survey_id).all()
-    responses_db = db.query(ResponseDB).filter(ResponseDB.survey_id == survey_id).all()
+    questions_db = (await db.scalars(select(QuestionDB).where(QuestionDB.survey_id == survey_id))).all()
+    
+    # Vorberechnete Aggregate aller Fragen in einer Abfrage laden
+    aggregates_db = (await db.scalars(
+        select(AnswerAggregateDB).where(AnswerAggregateDB.survey_id == survey_id).order_by(AnswerAggregateDB.id)
+    )).all()
+    aggregates: Dict[str, List[AnswerAggregateDB]] = {}
+    for aggregate in aggregates_db:
+        aggregates.setdefault(aggregate.question_id, []).append(aggregate)
     
     analytics = {
         "survey_id": survey_id,
-        "total_responses": len(responses_db),
+        "total_responses": survey_db.response_count,
         "questions_analytics": {}
     }
     
     for question in questions_db:
-        question_responses = []
-        for response in responses_db:
-            for answer_data in response.answers:
-                if answer_data["question_id"] == question.id:
-                    question_responses.append(answer_data["answer"])
+        question_aggregates = aggregates.get(question.id, [])
         
         if question.type in ["multiple_choice", "single_choice"]:
             # Antwortverteilung für Choice-Fragen
-            answer_counts = {}
-            for answer in question_responses:
-                if isinstance(answer, list):
-                    for choice in answer:
-                        answer_counts[choice] = answer_counts.get(choice, 0) + 1
-                else:
-                    answer_counts[answer] = answer_counts.get(answer, 0) + 1
+            answer_counts = {json.loads(a.key): a.count for a in question_aggregates if a.kind == "option"}
+            total_answers = sum(a.count for a in question_aggregates if a.kind == "answers")
             
             analytics["questions_analytics"][question.id] = {
                 "question_title": question.title,
                 "question_type": question.type,
                 "answer_distribution": answer_counts,
-                "total_answers": len(question_responses)
+                "total_answers": total_answers
             }
         
         elif question.type == "rating":
             # Durchschnittsbewertung für Rating-Fragen
-            ratings = [int(r) for r in question_responses if isinstance(r, (int, str)) and str(r).isdigit()]
-            avg_rating = sum(ratings) / len(ratings) if ratings else 0
+            rating_counts = {json.loads(a.key): a.count for a in question_aggregates if a.kind == "rating"}
+            total_ratings = sum(rating_counts.values())
+            rating_sum = sum(a.value_sum for a in question_aggregates if a.kind == "rating")
+            avg_rating = rating_sum / total_ratings if total_ratings else 0
             
             analytics["questions_analytics"][question.id] = {
                 "question_title": question.title,
                 "question_type": question.type,
                 "average_rating": round(avg_rating, 2),
-                "total_ratings": len(ratings),
-                "rating_distribution": {str(i): ratings.count(i) for i in range(1, 6)}
+                "total_ratings": total_ratings,
+                "rating_distribution": {str(i): rating_counts.get(i, 0) for i in RATING_SCALE}
             }
     
     return analytics
 
 # Export Endpoint
-@app.get("/surveys/{survey_id}/export/", tags=["Export"])
-async def export_survey_to_excel(survey_id: str, db: Session = Depends(get_db)):
-    """Exportiert Umfrage-Ergebnisse als Excel-Datei"""
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+XLSX_STREAM_CHUNK_SIZE = 64 * 1024
+
+class XlsxStreamSink(io.RawIOBase):
+    """
+    Nicht-seekbares Schreibziel für Workbook.save().
+    Sammelt die Bytes in Blöcken und reicht sie threadsicher an den StreamingResponse weiter.
+    """
     
-    # Umfrage finden
-    survey = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
-    if not survey:
-        raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, max_pending_chunks: int = 8):
+        super().__init__()
+        self.loop = loop
+        self.queue = queue
+        self.buffer = bytearray()
+        self.pending = threading.Semaphore(max_pending_chunks)  # Backpressure gegenüber dem Client
+        self.cancelled = threading.Event()
+        self.aborted = False
     
-    # Fragen laden
-    questions = db.query(QuestionDB).filter(QuestionDB.survey_id == survey_id).order_by(QuestionDB.order).all()
-    if not questions:
-        raise HTTPException(status_code=404, detail="Keine Fragen für diese Umfrage gefunden")
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        if self.aborted:
+            # Aufräumen nach dem Abbruch (z.B. ZipFile.__del__): Daten verwerfen statt erneut zu werfen
+            return len(data)
+        self.buffer += data
+        if len(self.buffer) >= XLSX_STREAM_CHUNK_SIZE:
+            self.emit()
+        return len(data)
+    
+    def flush(self):
+        if not self.aborted:
+            super().flush()
+    
+    def emit(self):
+        """Aktuellen Puffer als Chunk an den Event Loop übergeben"""
+        if not self.buffer:
+            return
+        while True:
+            if self.cancelled.is_set():
+                self.aborted = True
+                raise OSError("Export-Stream wurde abgebrochen")
+            if self.pending.acquire(timeout=0.5):
+                break
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, chunk)
+
+class XlsxColumnWidths:
+    """
+    Merkt sich die längsten Werte pro Spalte.
+    Write-only Sheets schreiben die Spaltenbreiten vor der ersten Zeile, daher werden sie vorab gesammelt.
+    """
+    
+    def __init__(self):
+        self.lengths: Dict[int, int] = {}
     
-    # Antworten laden
-    responses = db.query(ResponseDB).filter(ResponseDB.survey_id == survey_id).all()
+    def track_length(self, column: int, length: Optional[int]):
+        if length:
+            self.lengths[column] = max(self.lengths.get(column, 0), length)
     
-    # Excel-Datei erstellen
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Umfrage Ergebnisse"
+    def track(self, row: list):
+        for column, value in enumerate(row, 1):
+            value = getattr(value, "value", value)  # gestylte Zellen (xlsx_cell)
+            if value is not None:
+                self.track_length(column, len(str(value)))
     
-    # Header-Style
+    def apply(self, ws):
+        for column, length in self.lengths.items():
+            ws.column_dimensions[get_column_letter(column)].width = min(length + 2, 50)
+
+def xlsx_cell(ws, value: Any, font: Optional[Font] = None, fill: Optional[PatternFill] = None, alignment: Optional[Alignment] = None) -> WriteOnlyCell:
+    """Gestylte Zelle für ein write-only Sheet erzeugen"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font:
+        cell.font = font
+    if fill:
+        cell.fill = fill
+    if alignment:
+        cell.alignment = alignment
+    return cell
+
+async def stream_survey_xlsx(survey_id: str, questions: List[QuestionDB]) -> AsyncIterator[bytes]:
+    """Erzeugt die Excel-Datei zeilenweise (write-only) und streamt das fertige Archiv blockweise"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Umfrage Ergebnisse")
+    widths = XlsxColumnWidths()
+    
+    # Styles
+    bold_font = Font(bold=True)
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
     header_alignment = Alignment(horizontal="center", vertical="center")
+    column_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
     
-    # Umfrage-Informationen
-    ws['A1'] = "Umfrage-Titel:"
-    ws['B1'] = survey.title
-    ws['A2'] = "Beschreibung:"
-    ws['B2'] = survey.description or "Keine Beschreibung"
-    ws['A3'] = "Status:"
-    ws['B3'] = survey.status
-    ws['A4'] = "Erstellt am:"
-    ws['B4'] = survey.created_at.strftime("%d.%m.%Y %H:%M")
-    ws['A5'] = "Antworten gesamt:"
-    ws['B5'] = len(responses)
-    
-    # Style für Umfrage-Info
-    for row in range(1, 6):
-        ws[f'A{row}'].font = Font(bold=True)
-    
-    current_row = 7
-    
-    # Für jede Frage
-    for question_idx, question in enumerate(questions, 1):
-        # Frage-Header
-        ws[f'A{current_row}'] = f"Frage {question_idx}: {question.title}"
-        ws[f'A{current_row}'].font = header_font
-        ws[f'A{current_row}'].fill = header_fill
-        ws[f'A{current_row}'].alignment = header_alignment
-        
-        # Merge cells für Frage-Header
-        ws.merge_cells(f'A{current_row}:D{current_row}')
-        current_row += 1
-        
-        # Fragen-spezifische Daten verarbeiten
-        question_responses = []
-        for response in responses:
-            for answer in response.answers:
-                if answer.get('question_id') == question.id:
-                    question_responses.append({
-                        'participant': response.participant_name or f"Teilnehmer {response.id[:8]}",
-                        'answer': answer.get('answer', ''),
-                        'submitted_at': response.submitted_at
-                    })
-        
-        if question.type in ['single_choice', 'multiple_choice', 'yes_no']:
-            # Auswahl-Fragen: Zusammenfassung
-            ws[f'A{current_row}'] = "Option"
-            ws[f'B{current_row}'] = "Anzahl"
-            ws[f'C{current_row}'] = "Prozent"
-            
-            # Header-Style für Spalten
-            for col in ['A', 'B', 'C']:
-                ws[f'{col}{current_row}'].font = Font(bold=True)
-                ws[f'{col}{current_row}'].fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
-            
-            current_row += 1
+    text_answers_query = select(
+        AnswerDB.response_id, AnswerDB.value_text, AnswerDB.value_int, AnswerDB.value_bool, AnswerDB.value_json,
+        ResponseDB.participant_name, ResponseDB.submitted_at
+    ).join(ResponseDB, ResponseDB.id == AnswerDB.response_id)
+    
+    async with AsyncSessionLocal() as db:
+        survey = await db.get(SurveyDB, survey_id)
+        
+        # Auswahl- und Rating-Fragen kommen aus den vorberechneten Aggregaten
+        aggregates: Dict[str, List[AnswerAggregateDB]] = {}
+        for aggregate in await db.scalars(
+            select(AnswerAggregateDB).where(AnswerAggregateDB.survey_id == survey_id).order_by(AnswerAggregateDB.id)
+        ):
+            aggregates.setdefault(aggregate.question_id, []).append(aggregate)
+        
+        # Umfrage-Informationen
+        info_rows = [
+            ["Umfrage-Titel:", survey.title],
+            ["Beschreibung:", survey.description or "Keine Beschreibung"],
+            ["Status:", survey.status],
+            ["Erstellt am:", survey.created_at.strftime("%d.%m.%Y %H:%M")],
+            ["Antworten gesamt:", survey.response_count],
+        ]
+        
+        # Abschnitte pro Frage vorbereiten (Textantworten werden später gestreamt)
+        sections = []
+        for question_idx, question in enumerate(questions, 1):
+            question_aggregates = aggregates.get(question.id, [])
+            rows = []
             
-            # Optionen zählen
-            option_counts = {}
-            total_responses = len(question_responses)
+            if question.type in ['single_choice', 'multiple_choice', 'yes_no']:
+                # Auswahl-Fragen: Zusammenfassung
+                column_headers = ["Option", "Anzahl", "Prozent"]
+                total_responses = sum(a.count for a in question_aggregates if a.kind == "answers")
+                for aggregate in question_aggregates:
+                    if aggregate.kind == "option":
+                        percentage = (aggregate.count / total_responses * 100) if total_responses > 0 else 0
+                        rows.append([json.loads(aggregate.key), aggregate.count, f"{percentage:.1f}%"])
             
-            for resp in question_responses:
-                answer = resp['answer']
-                if question.type == 'multiple_choice':
-                    # Multiple Choice kann mehrere Antworten haben
-                    if isinstance(answer, list):
-                        for option in answer:
-                            option_counts[option] = option_counts.get(option, 0) + 1
-                    else:
-                        option_counts[answer] = option_counts.get(answer, 0) + 1
-                else:
-                    option_counts[answer] = option_counts.get(answer, 0) + 1
+            elif question.type == 'rating':
+                # Rating-Fragen: Verteilung 1-5 und Durchschnitt
+                column_headers = ["Bewertung", "Anzahl", "Prozent"]
+                rating_counts = {json.loads(a.key): a.count for a in question_aggregates if a.kind == "rating"}
+                ratings_total = sum(rating_counts.get(rating, 0) for rating in RATING_SCALE)
+                ratings_sum = sum(rating * rating_counts.get(rating, 0) for rating in RATING_SCALE)
+                for rating in RATING_SCALE:
+                    count = rating_counts.get(rating, 0)
+                    percentage = (count / ratings_total * 100) if ratings_total else 0
+                    rows.append([f"{rating} Stern{'e' if rating != 1 else ''}", count, f"{percentage:.1f}%"])
+                if ratings_total:
+                    rows.append([xlsx_cell(ws, "Durchschnitt:", font=bold_font), f"{ratings_sum / ratings_total:.2f}"])
             
-            # Optionen auflisten
-            for option, count in option_counts.items():
-                percentage = (count / total_responses * 100) if total_responses > 0 else 0
-                ws[f'A{current_row}'] = option
-                ws[f'B{current_row}'] = count
-                ws[f'C{current_row}'] = f"{percentage:.1f}%"
-                current_row += 1
-                
-        elif question.type == 'rating':
-            # Rating-Fragen: Statistiken
-            ws[f'A{current_row}'] = "Bewertung"
-            ws[f'B{current_row}'] = "Anzahl"
-            ws[f'C{current_row}'] = "Prozent"
+            elif question.type == 'text':
+                # Text-Fragen: alle Antworten, werden beim Schreiben gestreamt
+                column_headers = ["Teilnehmer", "Antwort", "Zeitpunkt"]
+                rows = None
             
-            # Header-Style
-            for col in ['A', 'B', 'C']:
-                ws[f'{col}{current_row}'].font = Font(bold=True)
-                ws[f'{col}{current_row}'].fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+            else:
+                column_headers = None
             
+            title = f"Frage {question_idx}: {question.title}"
+            widths.track([title])
+            if column_headers:
+                widths.track(column_headers)
+            for row in rows or []:
+                widths.track(row)
+            sections.append((question, title, column_headers, rows))
+        
+        for row in info_rows:
+            widths.track(row)
+        
+        # Maximale Längen der Textantworten per SQL statt über alle Zeilen
+        text_question_ids = [q.id for q in questions if q.type == 'text']
+        if text_question_ids:
+            name_length, answer_length = (await db.execute(
+                select(func.max(func.length(ResponseDB.participant_name)), func.max(func.length(AnswerDB.value_text)))
+                .join(ResponseDB, ResponseDB.id == AnswerDB.response_id)
+                .where(AnswerDB.survey_id == survey_id, AnswerDB.question_id.in_(text_question_ids))
+            )).one()
+            widths.track_length(1, max(name_length or 0, len("Teilnehmer 12345678")))
+            widths.track_length(2, max(answer_length or 0, len("Keine Antwort")))
+            widths.track_length(3, len("01.01.2000 00:00"))
+        
+        widths.apply(ws)
+        
+        # Zeilen schreiben
+        for label, value in info_rows:
+            ws.append([xlsx_cell(ws, label, font=bold_font), value])
+        ws.append([])
+        current_row = 7
+        
+        for question, title, column_headers, rows in sections:
+            # Frage-Header über A-D
+            ws.append([xlsx_cell(ws, title, font=header_font, fill=header_fill, alignment=header_alignment)])
+            ws.merged_cells.add(f"A{current_row}:D{current_row}")
             current_row += 1
             
-            # Bewertungen zählen
-            ratings = []
-            for resp in question_responses:
-                try:
-                    rating = int(resp['answer'])
-                    if 1 <= rating <= 5:
-                        ratings.append(rating)
-                except (ValueError, TypeError):
-                    continue
-            
-            # Rating-Verteilung
-            for rating in range(1, 6):
-                count = ratings.count(rating)
-                percentage = (count / len(ratings) * 100) if ratings else 0
-                ws[f'A{current_row}'] = f"{rating} Stern{'e' if rating != 1 else ''}"
-                ws[f'B{current_row}'] = count
-                ws[f'C{current_row}'] = f"{percentage:.1f}%"
-                current_row += 1
-            
-            # Durchschnitt
-            if ratings:
-                avg_rating = sum(ratings) / len(ratings)
-                ws[f'A{current_row}'] = "Durchschnitt:"
-                ws[f'B{current_row}'] = f"{avg_rating:.2f}"
-                ws[f'A{current_row}'].font = Font(bold=True)
+            if column_headers:
+                ws.append([xlsx_cell(ws, header, font=bold_font, fill=column_fill) for header in column_headers])
                 current_row += 1
-                
-        elif question.type == 'text':
-            # Text-Fragen: Alle Antworten auflisten
-            ws[f'A{current_row}'] = "Teilnehmer"
-            ws[f'B{current_row}'] = "Antwort"
-            ws[f'C{current_row}'] = "Zeitpunkt"
             
-            # Header-Style
-            for col in ['A', 'B', 'C']:
-                ws[f'{col}{current_row}'].font = Font(bold=True)
-                ws[f'{col}{current_row}'].fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+            if rows is not None:
+                for row in rows:
+                    ws.append(row)
+                    current_row += 1
+            else:
+                result = await db.stream(
+                    text_answers_query.where(
+                        AnswerDB.survey_id == survey_id,
+                        AnswerDB.question_id == question.id
+                    ).order_by(AnswerDB.id).execution_options(yield_per=500)
+                )
+                async for answer_row in result:
+                    answer = answer_value(answer_row.value_text, answer_row.value_int, answer_row.value_bool, answer_row.value_json)
+                    ws.append([
+                        answer_row.participant_name or f"Teilnehmer {answer_row.response_id[:8]}",
+                        answer or "Keine Antwort",
+                        answer_row.submitted_at.strftime("%d.%m.%Y %H:%M")
+                    ])
+                    current_row += 1
             
-            current_row += 1
-            
-            # Antworten auflisten
-            for resp in question_responses:
-                ws[f'A{current_row}'] = resp['participant']
-                ws[f'B{current_row}'] = resp['answer'] or "Keine Antwort"
-                ws[f'C{current_row}'] = resp['submitted_at'].strftime("%d.%m.%Y %H:%M")
-                current_row += 1
-        
-        current_row += 2  # Leerzeile zwischen Fragen
+            # Leerzeilen zwischen Fragen
+            ws.append([])
+            ws.append([])
+            current_row += 2
     
-    # Spaltenbreite anpassen
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
+    # Archiv im Thread schreiben und die Bytes direkt weiterreichen (keine Datei auf der Platte)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    sink = XlsxStreamSink(loop, queue)
+    
+    def save():
+        try:
+            wb.save(sink)
+            sink.emit()
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    save_task = loop.run_in_executor(None, save)
+    try:
+        while (chunk := await queue.get()) is not None:
+            sink.pending.release()
+            yield chunk
+        await save_task
+    finally:
+        if not save_task.done():
+            # Client hat abgebrochen: Schreib-Thread beenden und auf ihn warten
+            sink.cancelled.set()
             try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Temporäre Datei erstellen
-    temp_dir = tempfile.gettempdir()
+                await save_task
+            except Exception as e:
+                print(f"Excel export aborted: {e}")
+
+@app.get("/surveys/{survey_id}/export/", tags=["Export"])
+async def export_survey_to_excel(survey_id: str, db: AsyncSession = Depends(get_db)):
+    """Exportiert Umfrage-Ergebnisse als Excel-Datei (gestreamt, konstanter Speicherbedarf)"""
+    
+    # Umfrage finden
+    survey = await db.get(SurveyDB, survey_id)
+    if not survey:
+        raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+    
+    # Fragen laden
+    questions = (await db.scalars(
+        select(QuestionDB).where(QuestionDB.survey_id == survey_id).order_by(QuestionDB.order)
+    )).all()
+    if not questions:
+        raise HTTPException(status_code=404, detail="Keine Fragen für diese Umfrage gefunden")
+    
     filename = f"umfrage_{survey_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    filepath = os.path.join(temp_dir, filename)
     
-    # Excel-Datei speichern
-    wb.save(filepath)
+    # Datei als Download streamen
+    return StreamingResponse(
+        stream_survey_xlsx(survey_id, questions),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+# Rohdaten-Export (eine Zeile pro Response, eine Spalte pro Frage)
+EXPORT_STREAM_BATCH_SIZE = 500
+
+async def stream_response_partitions(survey_id: str) -> AsyncIterator[list]:
+    """Responses einer Umfrage blockweise über einen serverseitigen Cursor (yield_per) lesen"""
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(ResponseDB.id, ResponseDB.participant_name, ResponseDB.submitted_at, ResponseDB.answers)
+            .where(ResponseDB.survey_id == survey_id)
+            .order_by(ResponseDB.submitted_at)
+            .execution_options(yield_per=EXPORT_STREAM_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+def csv_export_value(answer: Any) -> Any:
+    """Antwortwert für eine CSV-Zelle aufbereiten (Mehrfachauswahl als '; '-getrennte Liste)"""
+    if answer is None:
+        return ""
+    if isinstance(answer, list):
+        return "; ".join(str(choice) for choice in answer)
+    return answer
+
+async def stream_survey_csv(survey_id: str, questions: List[QuestionDB]) -> AsyncIterator[str]:
+    """CSV im Wide-Format blockweise erzeugen"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["response_id", "participant_name", "submitted_at"] + [q.title for q in questions])
+    
+    async for partition in stream_response_partitions(survey_id):
+        for row in partition:
+            answers = {a["question_id"]: a["answer"] for a in row.answers}
+            writer.writerow(
+                [row.id, row.participant_name or "", row.submitted_at.isoformat()]
+                + [csv_export_value(answers.get(q.id)) for q in questions]
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Header auch bei Umfragen ohne Antworten ausliefern
+    if buffer.tell():
+        yield buffer.getvalue()
+
+async def stream_survey_ndjson(survey_id: str, questions: List[QuestionDB]) -> AsyncIterator[str]:
+    """Ein JSON-Objekt pro Zeile, Antworten unter der jeweiligen question_id"""
+    question_ids = [q.id for q in questions]
+    
+    async for partition in stream_response_partitions(survey_id):
+        lines = []
+        for row in partition:
+            answers = {a["question_id"]: a["answer"] for a in row.answers}
+            record = {
+                "response_id": row.id,
+                "participant_name": row.participant_name,
+                "submitted_at": row.submitted_at.isoformat()
+            }
+            for question_id in question_ids:
+                record[question_id] = answers.get(question_id)
+            lines.append(json.dumps(record, ensure_ascii=False))
+        yield "\n".join(lines) + "\n"
+
+async def get_export_questions(db: AsyncSession, survey_id: str) -> List[QuestionDB]:
+    """Prüft ob die Umfrage existiert und lädt ihre Fragen in Reihenfolge"""
+    survey = await db.get(SurveyDB, survey_id)
+    if not survey:
+        raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
     
-    # Datei als Download zurückgeben
-    return FileResponse(
-        filepath,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        filename=filename,
+    return (await db.scalars(
+        select(QuestionDB).where(QuestionDB.survey_id == survey_id).order_by(QuestionDB.order)
+    )).all()
+
+@app.get("/surveys/{survey_id}/export.csv", tags=["Export"])
+async def export_survey_to_csv(survey_id: str, db: AsyncSession = Depends(get_db)):
+    """Exportiert alle Antworten als CSV (eine Zeile pro Antwort, eine Spalte pro Frage)"""
+    questions = await get_export_questions(db, survey_id)
+    filename = f"umfrage_{survey_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    return StreamingResponse(
+        stream_survey_csv(survey_id, questions),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@app.get("/surveys/{survey_id}/export.ndjson", tags=["Export"])
+async def export_survey_to_ndjson(survey_id: str, db: AsyncSession = Depends(get_db)):
+    """Exportiert alle Antworten als NDJSON (ein JSON-Objekt pro Antwort)"""
+    questions = await get_export_questions(db, survey_id)
+    filename = f"umfrage_{survey_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    
+    return StreamingResponse(
+        stream_survey_ndjson(survey_id, questions),
+        media_type="application/x-ndjson",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
+# Server-Sent Events für Nur-Lese-Zuschauer
+@app.get("/surveys/{survey_id}/events", tags=["Surveys"])
+async def survey_events(survey_id: str, request: Request):
+    """
+    Live-Ereignisse einer Umfrage als Server-Sent Events (alles, was auch an Hosts geht).
+    Nach einem Abbruch setzt der Browser mit dem Header Last-Event-ID fort.
+    """
+    # Keine Session aus get_db, die würde für die ganze Dauer des Streams gehalten
+    async with AsyncSessionLocal() as db:
+        if not await db.scalar(select(SurveyDB.id).where(SurveyDB.id == survey_id)):
+            raise HTTPException(status_code=404, detail="Umfrage nicht gefunden")
+    
+    broker.ensure_started()
+    subscriber = ws_manager.open_event_stream(survey_id)
+    
+    # Verpasste Broadcasts seit Last-Event-ID (epoch:seq) nachliefern
+    last_event_id = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    if last_event_id:
+        epoch, _, last_seq = last_event_id.partition(":")
+        buffer = ws_manager.replay_buffers.get(survey_id)
+        missed = buffer.since(epoch, int(last_seq), "host") if buffer and last_seq.isdigit() else None
+        if missed is None:
+            subscriber.enqueue("resync_required", OutboundFrame({"type": "resync_required", "survey_id": survey_id}))
+        for message_type, frame in missed or []:
+            subscriber.enqueue(message_type, frame)
+    
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while not subscriber.closed:
+                frame = await subscriber.next_frame(HEARTBEAT_INTERVAL_SECONDS)
+                yield frame.event() if frame is not None else b": heartbeat\n\n"
+        finally:
+            ws_manager.close_event_stream(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Health Check
+@app.get("/metrics/websockets", tags=["Health"])
+async def websocket_metrics():
+    """Queue-Tiefen der WebSocket-Verbindungen und Überlauf-Statistiken"""
+    return ws_manager.queue_metrics()
+
+@app.get("/metrics/cache", tags=["Health"])
+async def cache_metrics():
+    """Treffer, Fehlschläge und Größe des Survey-Definition-Caches, geteilte Ladevorgänge"""
+    return {"survey_definitions": survey_cache.metrics(), "single_flight": single_flight.metrics()}
+
 @app.get("/health/", tags=["Health"])
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_db)):
     """API Gesundheitsstatus mit Datenbankstatistiken"""
-    surveys_count = db.query(SurveyDB).count()
-    responses_count = db.query(ResponseDB).count()
+    surveys_count = await db.scalar(select(func.count()).select_from(SurveyDB))
+    responses_count = await db.scalar(select(func.count()).select_from(ResponseDB))
     
     return {
         "status": "healthy",
@@ -1112,47 +3279,54 @@ async def options_handler(path: str):
         }
     )
 # WebSocket Endpunkte
+def resume_position(websocket: WebSocket) -> Optional[int]:
+    """last_seq aus den Query-Parametern einer wiederaufgenommenen Verbindung"""
+    try:
+        return int(websocket.query_params["last_seq"])
+    except (KeyError, ValueError):
+        return None
+
 @app.websocket("/ws/host/{survey_id}")
 async def websocket_host_endpoint(websocket: WebSocket, survey_id: str):
     """WebSocket für Survey-Hosts (ManageScreen/ResultScreen)"""
     session_id = websocket.query_params.get("session_id", "")
     
-    await websocket.accept()
+    await websocket.accept(subprotocol=negotiate_subprotocol(websocket))
     await ws_manager.connect(websocket, survey_id, "host", session_id)
     
     try:
+        # Wiederaufnahme: verpasste Broadcasts erneut senden
+        last_seq = resume_position(websocket)
+        if last_seq is not None:
+            await ws_manager.replay(websocket, survey_id, "host", websocket.query_params.get("epoch"), last_seq)
+        
         # Sende initial Stats
         try:
-            waiting_count = get_waiting_participants_count(survey_id)
-            await websocket.send_text(json.dumps({
+            waiting_count = await get_waiting_participants_count(survey_id)
+            await ws_manager.send(websocket, {
                 "type": "initial_stats",
                 "survey_id": survey_id,
                 "waiting_count": waiting_count
-            }))
+            })
         except Exception as e:
             print(f"Error sending initial stats: {e}")
         
-        # Keep connection alive
+        # Keep connection alive (Heartbeats kommen vom zentralen HeartbeatService)
         while True:
             try:
-                # Timeout für receive, damit Connection nicht blockiert
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                message = json.loads(data)
+                message = await receive_message(websocket)
+                ws_manager.touch(websocket)
                 
                 # Host-Commands verarbeiten
                 if message.get("type") == "start_survey":
                     await handle_start_survey(survey_id, websocket)
                 elif message.get("type") == "end_survey":
                     await handle_end_survey(survey_id, websocket)
+                elif message.get("type") == "subscribe_analytics":
+                    await handle_subscribe_analytics(survey_id, websocket)
                 elif message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    await ws_manager.send_frame(websocket, "pong", PONG_FRAME)
                     
-            except asyncio.TimeoutError:
-                # Sende Heartbeat
-                try:
-                    await websocket.send_text(json.dumps({"type": "heartbeat"}))
-                except:
-                    break
             except WebSocketDisconnect:
                 break
             except Exception as e:
@@ -1169,35 +3343,33 @@ async def websocket_participant_endpoint(websocket: WebSocket, survey_id: str):
     """WebSocket für Survey-Teilnehmer (PollScreen)"""
     session_id = websocket.query_params.get("session_id", "")
     
-    await websocket.accept()
+    await websocket.accept(subprotocol=negotiate_subprotocol(websocket))
+    # Noch präsent (Gnadenfrist nach kurzem Abbruch)? Dann ohne Leave/Join-Churn fortsetzen
+    resumed = await presence_store.contains(survey_id, session_id)
     await ws_manager.connect(websocket, survey_id, "participant", session_id)
     
     try:
         # Participant als wartend markieren
-        track_participant_join(survey_id, session_id)
-        await ws_manager.broadcast_to_hosts(survey_id, {
-            "type": "participant_joined",
-            "survey_id": survey_id,
-            "session_id": session_id,
-            "waiting_count": get_waiting_participants_count(survey_id)
-        })
+        await track_participant_join(survey_id, session_id)
+        if not resumed:
+            ws_manager.publish_room_event(survey_id, "participant_joined", session_id=session_id)
+        
+        # Wiederaufnahme: verpasste Broadcasts erneut senden statt die Umfrage per HTTP neu zu laden
+        last_seq = resume_position(websocket)
+        if last_seq is not None:
+            await ws_manager.replay(websocket, survey_id, "participant", websocket.query_params.get("epoch"), last_seq)
         
-        # Keep connection alive
+        # Keep connection alive (Heartbeats und Präsenz-Verlängerung kommen vom zentralen HeartbeatService)
         while True:
             try:
-                # Timeout für receive, damit Connection nicht blockiert
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                message = json.loads(data)
+                message = await receive_message(websocket)
+                ws_manager.touch(websocket)
                 
                 if message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
+                    await ws_manager.send_frame(websocket, "pong", PONG_FRAME)
+                elif message.get("type") == "submit":
+                    await handle_submit(survey_id, websocket, message)
                     
-            except asyncio.TimeoutError:
-                # Sende Heartbeat
-                try:
-                    await websocket.send_text(json.dumps({"type": "heartbeat"}))
-                except:
-                    break
             except WebSocketDisconnect:
                 break
             except Exception as e:
@@ -1210,30 +3382,84 @@ async def websocket_participant_endpoint(websocket: WebSocket, survey_id: str):
         await ws_manager.disconnect(websocket)
 
 # WebSocket Command Handlers
+async def handle_submit(survey_id: str, websocket: WebSocket, message: dict):
+    """Antworten über den Participant-WebSocket abgeben, gleiche Validierung wie POST /responses/"""
+    request_id = message.get("request_id")
+    session_id = ws_manager.connection_info.get(websocket, {}).get("session_id")
+    key = (survey_id, session_id, request_id) if request_id else None
+    
+    # Wiederholung derselben Abgabe (Client-Timeout, Reconnect): nicht erneut speichern, sondern erneut bestätigen
+    previous = ws_manager.recent_submits.get(key) if key else None
+    if previous is not None:
+        ack = await asyncio.shield(previous)
+        if ack is not None:
+            await ws_manager.send(websocket, ack)
+            return
+    
+    result = asyncio.get_running_loop().create_future()
+    if key:
+        ws_manager.remember_submit(key, result)
+    ack = None
+    try:
+        response_data = ResponseSubmission(
+            survey_id=survey_id,
+            answers=message.get("answers", []),
+            participant_name=message.get("participant_name")
+        )
+        async with AsyncSessionLocal() as db:
+            response = await store_response(response_data, db)
+        ack = {
+            "type": "submit_ack",
+            "request_id": request_id,
+            "response_id": response.id,
+            "submitted_at": response.submitted_at.isoformat()
+        }
+    except ValidationError:
+        await ws_manager.send(websocket, {"type": "submit_error", "request_id": request_id, "status": 422, "detail": "Ungültige Antworten"})
+        return
+    except HTTPException as e:
+        await ws_manager.send(websocket, {"type": "submit_error", "request_id": request_id, "status": e.status_code, "detail": e.detail})
+        return
+    except Exception as e:
+        # z.B. "database is locked" aus dem Group Commit: Client bekommt einen Fehler, die Verbindung bleibt offen
+        print(f"Error storing WebSocket submission: {e}")
+        await ws_manager.send(websocket, {"type": "submit_error", "request_id": request_id, "status": 500, "detail": "Antworten konnten nicht gespeichert werden"})
+        return
+    finally:
+        if ack is None and key and ws_manager.recent_submits.get(key) is result:
+            # Fehlgeschlagen: eine Wiederholung darf neu speichern
+            del ws_manager.recent_submits[key]
+        if not result.done():
+            result.set_result(ack)
+    
+    await ws_manager.send(websocket, ack)
+
 async def handle_start_survey(survey_id: str, host_websocket: WebSocket):
     """Survey starten - allen Teilnehmern Bescheid geben"""
     try:
         # Status in Datenbank ändern
-        db = SessionLocal()
-        survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+        async with AsyncSessionLocal() as db:
+            survey_db = await db.get(SurveyDB, survey_id)
+            if survey_db:
+                survey_db.status = SurveyStatus.ACTIVE.value
+                await bump_definition_version(db, survey_id)
+                await db.commit()
+                invalidate_survey(survey_id)
+        
         if survey_db:
-            survey_db.status = SurveyStatus.ACTIVE.value
-            db.commit()
-            
-            # Allen Teilnehmern Bescheid geben
-            await ws_manager.broadcast_to_participants(survey_id, {
+            # Allen Teilnehmern und Hosts (auch weiteren Host-Geräten und SSE-Zuschauern) Bescheid geben
+            await ws_manager.broadcast_to_all(survey_id, {
                 "type": "survey_started",
                 "survey_id": survey_id,
                 "message": "Die Umfrage wurde gestartet!"
             })
             
             # Host bestätigen
-            await host_websocket.send_text(json.dumps({
+            await ws_manager.send(host_websocket, {
                 "type": "survey_start_confirmed",
                 "survey_id": survey_id
-            }))
+            })
             
-        db.close()
     except Exception as e:
         print(f"Error starting survey: {e}")
 
@@ -1241,29 +3467,74 @@ async def handle_end_survey(survey_id: str, host_websocket: WebSocket):
     """Survey beenden"""
     try:
         # Status in Datenbank ändern
-        db = SessionLocal()
-        survey_db = db.query(SurveyDB).filter(SurveyDB.id == survey_id).first()
+        async with AsyncSessionLocal() as db:
+            survey_db = await db.get(SurveyDB, survey_id)
+            if survey_db:
+                survey_db.status = SurveyStatus.FINISHED.value
+                await bump_definition_version(db, survey_id)
+                await db.commit()
+                invalidate_survey(survey_id)
+        
         if survey_db:
-            survey_db.status = SurveyStatus.FINISHED.value
-            db.commit()
-            
-            # Allen Teilnehmern Bescheid geben
-            await ws_manager.broadcast_to_participants(survey_id, {
+            # Allen Teilnehmern und Hosts (auch weiteren Host-Geräten und SSE-Zuschauern) Bescheid geben
+            await ws_manager.broadcast_to_all(survey_id, {
                 "type": "survey_finished",
                 "survey_id": survey_id,
                 "message": "Die Umfrage wurde beendet!"
             })
             
             # Host bestätigen
-            await host_websocket.send_text(json.dumps({
+            await ws_manager.send(host_websocket, {
                 "type": "survey_end_confirmed",
                 "survey_id": survey_id
-            }))
+            })
             
-        db.close()
     except Exception as e:
         print(f"Error ending survey: {e}")
 
+async def handle_subscribe_analytics(survey_id: str, host_websocket: WebSocket):
+    """Live-Analytics abonnieren: Snapshot mit aktueller Sequenznummer, danach Deltas pro Batch"""
+    # Deltas puffern, bis der Snapshot in der Queue liegt
+    ws_manager.analytics_subscriptions[host_websocket] = []
+    try:
+        async with AsyncSessionLocal() as db:
+            # Lesetransaktion: alle Abfragen sehen denselben Datenbankstand (WAL-Snapshot)
+            await db.execute(text("BEGIN"))
+            survey_row = (await db.execute(
+                select(SurveyDB.analytics_version, SurveyDB.response_count).where(SurveyDB.id == survey_id)
+            )).first()
+            questions = await load_analytics_state(db, survey_id) if survey_row else {}
+            await db.rollback()
+        
+        buffered = ws_manager.analytics_subscriptions.get(host_websocket)
+        if survey_row is None or buffered is None:
+            # Umfrage existiert nicht oder Verbindung wurde inzwischen getrennt
+            ws_manager.analytics_subscriptions.pop(host_websocket, None)
+            return
+        
+        seq, response_count = survey_row
+        await ws_manager.send(host_websocket, {
+            "type": "analytics_snapshot",
+            "survey_id": survey_id,
+            "seq": seq or 0,
+            "response_count": response_count,
+            "questions": questions
+        })
+        for message in buffered:
+            if message["seq"] > (seq or 0):
+                await ws_manager.send(host_websocket, message)
+        ws_manager.analytics_subscriptions[host_websocket] = None
+            
+    except Exception as e:
+        print(f"Error subscribing to analytics: {e}")
+        ws_manager.analytics_subscriptions.pop(host_websocket, None)
+
+# Wartungsbefehle: python main.py rebuild-aggregates [survey_id ...]
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-aggregates":
+        rebuild_answer_aggregates(set(sys.argv[2:]) or None)
+
 ### not needed for vercel deployment
 #
 #if __name__ == "__main__":
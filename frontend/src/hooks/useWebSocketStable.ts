@@ -40,6 +40,9 @@ export function useWebSocketStable({
   const maxReconnectAttempts = 3;
   const isConnectingRef = useRef(false);
   const mountedRef = useRef(false);
+  // Position im Broadcast-Strom für die Wiederaufnahme nach einem Reconnect
+  const lastSeqRef = useRef<number | null>(null);
+  const epochRef = useRef<string | null>(null);
   
   // Set mounted flag on mount
   useEffect(() => {
@@ -93,7 +96,10 @@ export function useWebSocketStable({
     const sessionId = getSessionId();
     
     const wsBaseUrl = process.env.NODE_ENV === 'production' ? 'wss://quickpoll.up.railway.app' : 'ws://localhost:8000';
-    const wsUrl = `${wsBaseUrl}/ws/${role}/${surveyId}?session_id=${sessionId}`;
+    let wsUrl = `${wsBaseUrl}/ws/${role}/${surveyId}?session_id=${sessionId}`;
+    if (lastSeqRef.current !== null && epochRef.current) {
+      wsUrl += `&last_seq=${lastSeqRef.current}&epoch=${epochRef.current}`;
+    }
     const ws = new WebSocket(wsUrl);
     wsRef.current = ws;
 
@@ -117,6 +123,12 @@ export function useWebSocketStable({
           const message: WebSocketMessage = JSON.parse(event.data);
           console.log('WebSocket message received:', message);
           
+          // Nur nummerierte Broadcasts (mit epoch) merken, Analytics-Deltas haben eine eigene seq
+          if (message.epoch && typeof message.seq === 'number') {
+            lastSeqRef.current = message.seq;
+            epochRef.current = message.epoch;
+          }
+          
           setLastMessage(message);
           
           if (onMessage) {
@@ -199,6 +211,8 @@ export function useWebSocketStable({
 
     // Cleanup bei Unmount oder Dependency-Änderung
     return () => {
+      lastSeqRef.current = null;
+      epochRef.current = null;
       cleanup();
     };
   }, [enabled, surveyId, role]); // Entfernt connect/cleanup aus dependencies
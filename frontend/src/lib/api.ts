@@ -112,6 +112,12 @@ export async function getPublicSurvey(surveyId: string): Promise<Survey> {
   return apiRequest<Survey>(`/public/surveys/${surveyId}`);
 }
 
+// Nur den Status abfragen (sparse fieldset statt der ganzen Umfrage)
+export async function getPublicSurveyStatus(surveyId: string): Promise<Survey['status']> {
+  const data = await apiRequest<Pick<Survey, 'status'>>(`/public/surveys/${surveyId}?fields=status`);
+  return data.status;
+}
+
 export async function getAllSurveys(): Promise<Survey[]> {
   return apiRequest<Survey[]>('/surveys/');
 }
@@ -119,6 +125,52 @@ export async function getAllSurveys(): Promise<Survey[]> {
 // Alias für Rückwärtskompatibilität
 export const getSurveys = getAllSurveys;
 
+// Kompakte Dashboard-Ansicht einer Umfrage (ohne Fragen)
+export interface SurveySummary {
+  id: string;
+  title: string;
+  status: 'ready' | 'active' | 'finished';
+  created_at: string;
+  expires_at: string;
+  response_count: number;
+  question_count: number;
+}
+
+export interface SurveyPage<T = Survey> {
+  surveys: T[];
+  nextCursor: string | null;
+}
+
+/**
+ * Eine Seite der eigenen Umfragen (neueste zuerst), nextCursor für die nächste Seite
+ */
+export async function getSurveysPage(limit: number, after?: string | null): Promise<SurveyPage> {
+  return fetchSurveyPage<Survey>('/surveys/', limit, after);
+}
+
+/**
+ * Eine Seite der Dashboard-Zusammenfassung (nur angezeigte Spalten, Anzahl statt Fragenliste)
+ */
+export async function getSurveySummaries(limit: number, after?: string | null): Promise<SurveyPage<SurveySummary>> {
+  return fetchSurveyPage<SurveySummary>('/surveys/summary', limit, after);
+}
+
+async function fetchSurveyPage<T>(endpoint: string, limit: number, after?: string | null): Promise<SurveyPage<T>> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (after) params.set('after', after);
+
+  const response = await fetch(`${BASE_URL}${endpoint}?${params}`, {
+    headers: { 'X-Session-ID': getSessionId() },
+  });
+  if (!response.ok) {
+    throw new Error(`API Error: ${response.status} - ${response.statusText}`);
+  }
+  return {
+    surveys: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+  };
+}
+
 export async function updateSurvey(surveyId: string, surveyData: Partial<Survey>): Promise<Survey> {
   return apiRequest<Survey>(`/surveys/${surveyId}`, {
     method: 'PUT',
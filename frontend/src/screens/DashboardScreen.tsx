@@ -1,8 +1,11 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { getSurveys, deleteSurvey, type Survey } from '../lib/api';
+import { getSurveySummaries, deleteSurvey, type SurveySummary } from '../lib/api';
 import ConfirmDialog from './Components/ConfirmDialog';
 
+// Umfragen pro Seite im Dashboard
+const PAGE_SIZE = 30;
+
 const DashboardScreen = () => {
   const navigate = useNavigate();
   
@@ -14,9 +17,11 @@ const DashboardScreen = () => {
   });
   
   // State für Umfragen und Loading
-  const [surveys, setSurveys] = useState<Survey[]>([]);
+  const [surveys, setSurveys] = useState<SurveySummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Umfragen beim Component Mount laden
   useEffect(() => {
@@ -24,8 +29,9 @@ const DashboardScreen = () => {
       try {
         setLoading(true);
         setError(null);
-        const data = await getSurveys();
-        setSurveys(data);
+        const page = await getSurveySummaries(PAGE_SIZE);
+        setSurveys(page.surveys);
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error('Fehler beim Laden der Umfragen:', err);
         setError('Fehler beim Laden der Umfragen');
@@ -37,6 +43,22 @@ const DashboardScreen = () => {
     loadSurveys();
   }, []);
 
+  // Nächste Seite anhängen
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await getSurveySummaries(PAGE_SIZE, nextCursor);
+      setSurveys(prevSurveys => [...prevSurveys, ...page.surveys]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Fehler beim Laden weiterer Umfragen:', err);
+      setError('Fehler beim Laden der Umfragen');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Hilfsfunktion für Datumsformatierung
   const formatDate = (dateString: string): string => {
     const date = new Date(dateString);
@@ -175,7 +197,7 @@ const DashboardScreen = () => {
                       <svg xmlns="http://www.w3.org/2000/svg" className="w-5 h-5" fill="none" viewBox="0 0 24 24" stroke="currentColor" strokeWidth={1.5}>
                         <path strokeLinecap="round" strokeLinejoin="round" d="M2.25 7.125C2.25 6.504 2.754 6 3.375 6h6c.621 0 1.125.504 1.125 1.125v3.75c0 .621-.504 1.125-1.125 1.125h-6a1.125 1.125 0 0 1-1.125-1.125v-3.75ZM14.25 8.625c0-.621.504-1.125 1.125-1.125h5.25c.621 0 1.125.504 1.125 1.125v8.25c0 .621-.504 1.125-1.125 1.125h-5.25a1.125 1.125 0 0 1-1.125-1.125v-8.25ZM3.75 16.125c0-.621.504-1.125 1.125-1.125h5.25c.621 0 1.125.504 1.125 1.125v2.25c0 .621-.504 1.125-1.125 1.125h-5.25a1.125 1.125 0 0 1-1.125-1.125v-2.25Z" />
                       </svg>
-                      <span>{survey.questions.length} {survey.questions.length === 1 ? 'Frage' : 'Fragen'}</span>
+                      <span>{survey.question_count} {survey.question_count === 1 ? 'Frage' : 'Fragen'}</span>
                     </div>
 
                     {/* Antworten-Count nur für aktive und beendete Umfragen anzeigen */}
@@ -225,6 +247,16 @@ const DashboardScreen = () => {
               );
             })}
           </div>
+
+          {nextCursor && (
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="mb-10 py-3 px-6 bg-white text-blue-600 font-medium rounded-lg border border-blue-200 hover:bg-blue-50 transition-colors duration-200"
+            >
+              {loadingMore ? 'Wird geladen...' : 'Weitere Umfragen laden'}
+            </button>
+          )}
         </div>
       )}
 
@@ -33,8 +33,8 @@ const ManageScreen: React.FC = () => {
     role: 'host',
     onMessage: (message: WebSocketMessage) => {
       switch (message.type) {
-        case 'participant_joined':
-        case 'participant_left':
+        case 'room_update':
+          // Gesammelte Beitritte/Austritte pro Tick
           setWaitingParticipants(message.waiting_count || 0);
           break;
         case 'initial_stats':
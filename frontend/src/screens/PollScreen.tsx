@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import {
   CheckSquare,
   MessageSquare,
@@ -11,7 +11,7 @@ import {
   ThumbsDown,
 } from "lucide-react";
 import { useParams } from "react-router-dom";
-import { getPublicSurvey, submitSurveyResponse, type Survey, type Question } from "../lib/api";
+import { getPublicSurvey, getPublicSurveyStatus, submitSurveyResponse, type Survey, type Question } from "../lib/api";
 import { useWebSocketStable as useWebSocket, type WebSocketMessage } from "../hooks/useWebSocketStable";
 
 const PollScreen: React.FC = () => {
@@ -25,9 +25,14 @@ const PollScreen: React.FC = () => {
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [isSubmitted, setIsSubmitted] = useState(false);
   const [errorMessage, setErrorMessage] = useState("");
+  // Offene Abgabe über den WebSocket, wartet auf submit_ack / submit_error
+  const pendingSubmitRef = useRef<{ requestId: string; resolve: () => void; reject: (error: Error) => void } | null>(null);
+  // request_id der letzten unbestätigten Abgabe: ein erneuter Versuch mit denselben Antworten schickt dieselbe ID,
+  // damit der Server eine bereits gespeicherte Abgabe nur erneut bestätigt
+  const unconfirmedSubmitRef = useRef<{ requestId: string; answers: string } | null>(null);
 
   // WebSocket für Live-Updates vom Survey-Host
-  useWebSocket({
+  const { isConnected, sendMessage } = useWebSocket({
     surveyId: pollId && pollId !== 'undefined' ? pollId : null,
     role: 'participant',
     onMessage: (message: WebSocketMessage) => {
@@ -40,6 +45,26 @@ const PollScreen: React.FC = () => {
           // Survey wurde beendet
           setSurvey(prev => prev ? { ...prev, status: 'finished' } : null);
           break;
+        case 'submit_ack':
+        case 'submit_error': {
+          const pending = pendingSubmitRef.current;
+          if (!pending || pending.requestId !== message.request_id) break;
+          pendingSubmitRef.current = null;
+          if (message.type === 'submit_ack') {
+            pending.resolve();
+          } else {
+            pending.reject(new Error(message.detail));
+          }
+          break;
+        }
+        case 'resync_required':
+          // Verpasste Nachrichten nicht mehr verfügbar - nur den Status neu laden, Antworten bleiben erhalten
+          if (pollId) {
+            getPublicSurveyStatus(pollId)
+              .then(status => setSurvey(prev => prev ? { ...prev, status } : prev))
+              .catch(err => console.error("Fehler beim Abgleich der Umfrage:", err));
+          }
+          break;
       }
     },
     enabled: !!pollId && !isSubmitted
@@ -91,6 +116,36 @@ const PollScreen: React.FC = () => {
     }
   };
 
+  // Antworten über den offenen WebSocket abgeben (spart einen HTTP-Request), sonst per POST
+  const submitAnswers = (responseData: { survey_id: string; answers: { question_id: string; answer: string | string[] | number | boolean }[] }): Promise<void> => {
+    if (!isConnected) {
+      return submitSurveyResponse(responseData).then(() => undefined);
+    }
+
+    const answersKey = JSON.stringify(responseData.answers);
+    let unconfirmed = unconfirmedSubmitRef.current;
+    if (!unconfirmed || unconfirmed.answers !== answersKey) {
+      unconfirmed = { requestId: Math.random().toString(36).slice(2), answers: answersKey };
+      unconfirmedSubmitRef.current = unconfirmed;
+    }
+    const requestId = unconfirmed.requestId;
+
+    return new Promise((resolve, reject) => {
+      const timeout = setTimeout(() => {
+        if (pendingSubmitRef.current?.requestId === requestId) {
+          pendingSubmitRef.current = null;
+          reject(new Error('Keine Bestätigung vom Server'));
+        }
+      }, 10000);
+      pendingSubmitRef.current = {
+        requestId,
+        resolve: () => { clearTimeout(timeout); unconfirmedSubmitRef.current = null; resolve(); },
+        reject: (error: Error) => { clearTimeout(timeout); reject(error); }
+      };
+      sendMessage({ type: 'submit', request_id: requestId, answers: responseData.answers });
+    });
+  };
+
   // Validierung
   const validateForm = (): boolean => {
     if (!survey) return false;
@@ -143,7 +198,7 @@ const PollScreen: React.FC = () => {
         answers: submissions
       };
 
-      await submitSurveyResponse(responseData);
+      await submitAnswers(responseData);
       setIsSubmitted(true);
     } catch (error: any) {
       console.error("Fehler beim Senden der Antworten:", error);
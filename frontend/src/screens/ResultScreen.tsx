@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import {
   BarChart3,
   MessageSquare,
@@ -22,11 +22,109 @@ interface ProcessedQuestion {
   data: any; // Different data structure based on type
 }
 
+// Live-Aggregate pro Frage, Keys sind JSON-kodierte Antwortwerte (wie im Backend)
+interface QuestionAggregate {
+  answers: number;
+  options: { [key: string]: number };
+  ratings: { [key: string]: number };
+  rating_sum: number;
+  texts: string[];
+}
+
+type AggregateState = { [questionId: string]: QuestionAggregate };
+
+// Bewertungsskala (Sterne), wie RATING_SCALE im Backend
+const RATING_SCALE = [1, 2, 3, 4, 5];
+
+const emptyAggregate = (): QuestionAggregate => ({ answers: 0, options: {}, ratings: {}, rating_sum: 0, texts: [] });
+
+// Backend kodiert Keys mit json.dumps (ASCII-escaped), daher auf JSON.stringify normalisieren
+const normalizeKey = (key: string): string => JSON.stringify(JSON.parse(key));
+
+// Analytics-Delta (oder Snapshot auf leerem Zustand) einrechnen
+const applyAggregateDelta = (state: AggregateState, delta: AggregateState): AggregateState => {
+  const next: AggregateState = { ...state };
+
+  Object.entries(delta).forEach(([questionId, change]) => {
+    const current = next[questionId] || emptyAggregate();
+    const merged: QuestionAggregate = {
+      answers: current.answers + change.answers,
+      options: { ...current.options },
+      ratings: { ...current.ratings },
+      rating_sum: current.rating_sum + change.rating_sum,
+      texts: [...current.texts, ...change.texts]
+    };
+
+    Object.entries(change.options).forEach(([key, count]) => {
+      const normalized = normalizeKey(key);
+      merged.options[normalized] = (merged.options[normalized] || 0) + count;
+    });
+    Object.entries(change.ratings).forEach(([key, count]) => {
+      const normalized = normalizeKey(key);
+      merged.ratings[normalized] = (merged.ratings[normalized] || 0) + count;
+    });
+
+    next[questionId] = merged;
+  });
+
+  return next;
+};
+
+// Aggregate aus der vollständigen Antwortliste (Fallback ohne Live-Analytics)
+const aggregateResponses = (questions: Question[], responses: Response[]): AggregateState => {
+  const state: AggregateState = {};
+  const questionTypes: { [questionId: string]: Question['type'] } = {};
+  questions.forEach(question => {
+    state[question.id] = emptyAggregate();
+    questionTypes[question.id] = question.type;
+  });
+
+  responses.forEach(response => {
+    response.answers.forEach(answer => {
+      const aggregate = state[answer.question_id];
+      if (!aggregate) return;
+
+      aggregate.answers++;
+      switch (questionTypes[answer.question_id]) {
+        case 'single_choice':
+        case 'multiple_choice':
+        case 'yes_no':
+          const choices = Array.isArray(answer.answer) ? answer.answer : [answer.answer];
+          choices.forEach(choice => {
+            const key = JSON.stringify(choice);
+            aggregate.options[key] = (aggregate.options[key] || 0) + 1;
+          });
+          break;
+
+        case 'rating':
+          // Nur Werte der Skala zählen, wie die Aggregate im Backend
+          const rating = Number(answer.answer);
+          if (typeof answer.answer !== 'boolean' && RATING_SCALE.includes(rating)) {
+            const key = JSON.stringify(rating);
+            aggregate.ratings[key] = (aggregate.ratings[key] || 0) + 1;
+            aggregate.rating_sum += rating;
+          }
+          break;
+
+        case 'text':
+          aggregate.texts.push(answer.answer as string);
+          break;
+      }
+    });
+  });
+
+  return state;
+};
+
 const ResultScreen: React.FC = () => {
   const { id: pollId } = useParams<{ id: string }>();
   const navigate = useNavigate();
   const [survey, setSurvey] = useState<Survey | null>(null);
   const [responses, setResponses] = useState<Response[]>([]);
+  const [aggregates, setAggregates] = useState<AggregateState>({});
+  const [responseCount, setResponseCount] = useState(0);
+  // Sequenznummer des Live-Analytics-Abos (null = kein gültiger Snapshot, Fallback auf Antwortliste)
+  const analyticsSeqRef = useRef<number | null>(null);
   const [processedQuestions, setProcessedQuestions] = useState<ProcessedQuestion[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -41,13 +139,33 @@ const ResultScreen: React.FC = () => {
     role: 'host',
     onMessage: (message: WebSocketMessage) => {
       switch (message.type) {
-        case 'response_submitted':
-          // Neue Antwort erhalten - Daten neu laden
-          loadResponsesData();
-          break;
-        case 'participant_joined':
-        case 'participant_left':
+        case 'room_update':
+          // Gesammelte Raum-Ereignisse pro Tick
           setWaitingParticipants(message.waiting_count || 0);
+          if (message.new_responses > 0 && analyticsSeqRef.current === null) {
+            // Ohne Live-Analytics: Daten einmal pro Tick neu laden
+            loadResponsesData();
+          }
+          break;
+        case 'analytics_snapshot':
+          analyticsSeqRef.current = message.seq;
+          setAggregates(applyAggregateDelta({}, message.questions));
+          setResponseCount(message.response_count);
+          break;
+        case 'analytics_delta':
+          if (analyticsSeqRef.current === null || message.seq <= analyticsSeqRef.current) {
+            // Noch kein Snapshot oder bereits im Snapshot enthalten
+            break;
+          }
+          if (message.seq !== analyticsSeqRef.current + 1) {
+            // Lücke in der Sequenz - neuen Snapshot anfordern
+            analyticsSeqRef.current = null;
+            sendMessage({ type: 'subscribe_analytics' });
+            break;
+          }
+          analyticsSeqRef.current = message.seq;
+          setAggregates(prev => applyAggregateDelta(prev, message.questions));
+          setResponseCount(message.response_count);
           break;
         case 'initial_stats':
           setWaitingParticipants(message.waiting_count || 0);
@@ -67,14 +185,30 @@ const ResultScreen: React.FC = () => {
     loadSurveyData();
   }, [pollId]);
 
-  // Auto-update processed questions when responses or survey data changes for live chart updates
+  // Live-Analytics abonnieren: Snapshot, danach Deltas statt kompletter Antwortliste
+  useEffect(() => {
+    if (isConnected) {
+      sendMessage({ type: 'subscribe_analytics' });
+    } else {
+      analyticsSeqRef.current = null;
+    }
+  }, [isConnected]);
+
+  // Fallback ohne Live-Analytics: Aggregate aus der geladenen Antwortliste berechnen
   useEffect(() => {
-    if (survey && responses) {
-      const processed = processQuestionData(survey.questions, responses);
-      setProcessedQuestions(processed);
+    if (survey && analyticsSeqRef.current === null) {
+      setAggregates(aggregateResponses(survey.questions, responses));
+      setResponseCount(responses.length);
     }
   }, [survey, responses]);
 
+  // Auto-update processed questions when aggregates or survey data changes for live chart updates
+  useEffect(() => {
+    if (survey) {
+      setProcessedQuestions(processQuestionData(survey.questions, aggregates));
+    }
+  }, [survey, aggregates]);
+
   const loadResponsesData = async () => {
     if (!pollId) {
       return;
@@ -110,9 +244,7 @@ const ResultScreen: React.FC = () => {
         return;
       }
       
-      // Process question data for visualization
-      const processed = processQuestionData(surveyData.questions, responseData);
-      setProcessedQuestions(processed);
+      // processedQuestions will be automatically updated via useEffect
       
     } catch (error: any) {
       console.error('Error loading survey data:', error);
@@ -128,99 +260,75 @@ const ResultScreen: React.FC = () => {
     }
   };
 
-  // Process responses for each question type
-  const processQuestionData = (questions: Question[], responses: Response[]): ProcessedQuestion[] => {
+  // Process aggregates for each question type
+  const processQuestionData = (questions: Question[], aggregates: AggregateState): ProcessedQuestion[] => {
     return questions.map(question => {
-      const questionResponses = responses.flatMap(response => 
-        response.answers.filter(answer => answer.question_id === question.id)
-      );
+      const aggregate = aggregates[question.id] || emptyAggregate();
+      const total = aggregate.answers;
+      const percentage = (count: number) => total > 0 ? Math.round((count / total) * 100) : 0;
 
       const processedQuestion: ProcessedQuestion = {
         id: question.id,
         title: question.title,
         type: question.type,
-        totalResponses: questionResponses.length,
+        totalResponses: total,
         data: null
       };
 
       switch (question.type) {
         case 'single_choice':
         case 'multiple_choice':
-          const optionCounts: { [key: string]: number } = {};
-          question.options?.forEach(option => {
-            optionCounts[option] = 0;
-          });
-
-          questionResponses.forEach(response => {
-            if (question.type === 'single_choice') {
-              const answer = response.answer as string;
-              if (optionCounts.hasOwnProperty(answer)) {
-                optionCounts[answer]++;
-              }
-            } else {
-              const answers = response.answer as string[];
-              answers.forEach(answer => {
-                if (optionCounts.hasOwnProperty(answer)) {
-                  optionCounts[answer]++;
-                }
-              });
-            }
+          processedQuestion.data = (question.options || []).map(option => {
+            const count = aggregate.options[JSON.stringify(option)] || 0;
+            return {
+              label: option,
+              count,
+              percentage: percentage(count)
+            };
           });
-
-          processedQuestion.data = Object.entries(optionCounts).map(([option, count]) => ({
-            label: option,
-            count,
-            percentage: questionResponses.length > 0 ? Math.round((count / questionResponses.length) * 100) : 0
-          }));
           break;
 
         case 'rating':
-          const ratingCounts: { [key: number]: number } = {};
-          for (let i = 1; i <= 5; i++) {
-            ratingCounts[i] = 0;
-          }
-
-          questionResponses.forEach(response => {
-            const rating = response.answer as number;
-            if (ratingCounts.hasOwnProperty(rating)) {
-              ratingCounts[rating]++;
-            }
+          // Bezugsgröße sind die gültigen Bewertungen (1..5), wie in GET /analytics und im Excel-Export
+          const ratingsTotal = RATING_SCALE.reduce(
+            (sum, rating) => sum + (aggregate.ratings[JSON.stringify(rating)] || 0), 0
+          );
+          const ratings = RATING_SCALE.map(rating => {
+            const count = aggregate.ratings[JSON.stringify(rating)] || 0;
+            return {
+              rating,
+              count,
+              percentage: ratingsTotal > 0 ? Math.round((count / ratingsTotal) * 100) : 0
+            };
           });
-
-          const average = questionResponses.length > 0 
-            ? questionResponses.reduce((sum, response) => sum + (response.answer as number), 0) / questionResponses.length
-            : 0;
+          const average = ratingsTotal > 0 ? aggregate.rating_sum / ratingsTotal : 0;
 
           processedQuestion.data = {
-            ratings: Object.entries(ratingCounts).map(([rating, count]) => ({
-              rating: parseInt(rating),
-              count,
-              percentage: questionResponses.length > 0 ? Math.round((count / questionResponses.length) * 100) : 0
-            })),
+            ratings,
             average: Math.round(average * 10) / 10
           };
           break;
 
         case 'yes_no':
-          const yesCount = questionResponses.filter(response => response.answer === true).length;
-          const noCount = questionResponses.filter(response => response.answer === false).length;
+          const yesCount = aggregate.options['true'] || 0;
+          const noCount = aggregate.options['false'] || 0;
           
           processedQuestion.data = [
             {
               label: 'Ja',
               count: yesCount,
-              percentage: questionResponses.length > 0 ? Math.round((yesCount / questionResponses.length) * 100) : 0
+              percentage: percentage(yesCount)
             },
             {
               label: 'Nein',
               count: noCount,
-              percentage: questionResponses.length > 0 ? Math.round((noCount / questionResponses.length) * 100) : 0
+              percentage: percentage(noCount)
             }
           ];
           break;
 
         case 'text':
-          processedQuestion.data = questionResponses.map(response => response.answer as string);
+          processedQuestion.data = aggregate.texts;
           break;
       }
 
@@ -565,12 +673,12 @@ const ResultScreen: React.FC = () => {
                   {survey?.status === 'finished' ? (
                     <>
                       <div className="w-2 h-2 bg-gray-500 rounded-full flex-shrink-0"></div>
-                      <span>Umfrage beendet • {responses.length} Antworten</span>
+                      <span>Umfrage beendet • {responseCount} Antworten</span>
                     </>
                   ) : (
                     <>
                       <div className="w-2 h-2 bg-red-500 rounded-full animate-pulse flex-shrink-0"></div>
-                      <span>Live • {waitingParticipants} Teilnehmer • {responses.length} Antworten</span>
+                      <span>Live • {waitingParticipants} Teilnehmer • {responseCount} Antworten</span>
                     </>
                   )}
                   {/* WebSocket Status - nur bei aktiven Umfragen anzeigen */}